@@ -0,0 +1,90 @@
+"""Compares parse throughput of a thread pool and a process pool for growing worker counts.
+
+Run from the repository root: python -m benchmarks.concurrency [--count 20000] [--workers 1 2 4 8]
+On builds with the GIL, threads do not scale past one core; on free-threaded builds they should."""
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List
+
+from benchmarks import corpus
+from problem_function_signature import signature as sig
+
+
+def _parse_chunk(chunk: List[str]) -> int:
+    parsed = 0
+    for signature in chunk:
+        try:
+            sig.parse(signature, allow_uppercase=True)
+            parsed += 1
+        except sig.ValidationException:
+            pass
+    return parsed
+
+
+def threads(signatures: List[str], workers: int, chunk_size: int) -> float:
+    """Returns signatures parsed per second by a pool of workers threads."""
+    chunks = [signatures[i:i + chunk_size] for i in range(0, len(signatures), chunk_size)]
+    with ThreadPoolExecutor(workers) as executor:
+        start = time.perf_counter()
+        sum(executor.map(_parse_chunk, chunks))
+        return len(signatures) / (time.perf_counter() - start)
+
+
+def processes(signatures: List[str], workers: int, chunk_size: int) -> float:
+    """Returns signatures parsed per second by parse_many with workers processes, including their startup.
+    With one worker, parse_many parses in this process."""
+    start = time.perf_counter()
+    for _ in sig.parse_many(signatures, workers=workers, chunk_size=chunk_size, allow_uppercase=True):
+        pass
+    return len(signatures) / (time.perf_counter() - start)
+
+
+def run(count: int, worker_counts: List[int], chunk_size: int) -> Dict:
+    signatures = corpus.generate('typical', count)
+    results = []
+    for workers in worker_counts:
+        results.append({
+            'workers': workers,
+            'threads_ops_per_sec': threads(signatures, workers, chunk_size),
+            'processes_ops_per_sec': processes(signatures, workers, chunk_size),
+        })
+    return {
+        'python': platform.python_version(),
+        'implementation': platform.python_implementation(),
+        # sys._is_gil_enabled exists on 3.13+; earlier versions always have the GIL.
+        'gil_enabled': getattr(sys, '_is_gil_enabled', lambda: True)(),
+        'cpu_count': os.cpu_count(),
+        'count': count,
+        'results': results,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('-o', '--output', help='write results as JSON to this file')
+    parser.add_argument('--count', type=int, default=20000, help='signatures to parse per measurement')
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4, 8])
+    parser.add_argument('--chunk-size', type=int, default=500)
+    args = parser.parse_args()
+
+    report = run(args.count, args.workers, args.chunk_size)
+    print(f'Python {report["python"]}, GIL {"enabled" if report["gil_enabled"] else "disabled"}, '
+          f'{report["cpu_count"]} CPUs')
+    base = report['results'][0]
+    for result in report['results']:
+        print(f'{result["workers"]:3} workers  threads {result["threads_ops_per_sec"]:10.0f} ops/s '
+              f'(x{result["threads_ops_per_sec"] / base["threads_ops_per_sec"]:.1f})  '
+              f'processes {result["processes_ops_per_sec"]:10.0f} ops/s '
+              f'(x{result["processes_ops_per_sec"] / base["processes_ops_per_sec"]:.1f})')
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
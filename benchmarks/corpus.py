@@ -0,0 +1,88 @@
+"""Seeded generator of synthetic signature corpora for the benchmarks."""
+import random
+import string
+from typing import List
+
+PRIMITIVE_TYPES = ['int32', 'int64', 'bool', 'char', 'str', 'float']
+CUSTOM_TYPES = ['LinkedListNode', 'BinaryTreeNode', 'TreeNode']
+KINDS = ['typical', 'wide', 'deep', 'long_names', 'custom', 'malformed']
+
+
+def generate(kind: str, count: int, size: int = 100, seed: int = 0) -> List[str]:
+    """Returns count signatures of the given kind. size is the arity of 'wide', the nesting depth of
+    'deep', the name length of 'long_names' and the length of 'malformed' signatures."""
+    rnd = random.Random(f'{kind}-{size}-{seed}')
+    return [_GENERATORS[kind](rnd, size) for _ in range(count)]
+
+
+def random_type(rnd: random.Random, depth: int, composites=('list',) + tuple(CUSTOM_TYPES)) -> str:
+    data_type = rnd.choice(PRIMITIVE_TYPES)
+    for _ in range(depth):
+        data_type = f'{rnd.choice(composites)}[{data_type}]'
+    return data_type
+
+
+def _name(rnd: random.Random, length: int) -> str:
+    return rnd.choice(string.ascii_lowercase) + ''.join(
+        rnd.choice(string.ascii_lowercase + string.digits + '_') for _ in range(length - 1))
+
+
+def _signature(return_type: str, name: str, args) -> str:
+    return f'{return_type} {name}({", ".join(f"{arg_name}: {arg_type}" for arg_name, arg_type in args)})'
+
+
+def _typical(rnd: random.Random, size: int) -> str:
+    args = [(f'{_name(rnd, 3)}{i}', random_type(rnd, rnd.randint(0, 2), ('list',))) for i in range(rnd.randint(0, 4))]
+    return _signature(random_type(rnd, rnd.randint(0, 2), ('list',)), 'solve', args)
+
+
+def _wide(rnd: random.Random, size: int) -> str:
+    return _signature('int32', 'solve', [(f'arg{i}', random_type(rnd, rnd.randint(0, 2), ('list',)))
+                                         for i in range(size)])
+
+
+def _deep(rnd: random.Random, size: int) -> str:
+    return _signature(random_type(rnd, size, ('list',)), 'solve', [('a', random_type(rnd, size, ('list',)))])
+
+
+def _long_names(rnd: random.Random, size: int) -> str:
+    return _signature('int32', _name(rnd, size), [(_name(rnd, size) + str(i), 'list[int32]') for i in range(3)])
+
+
+def _custom(rnd: random.Random, size: int) -> str:
+    # Each custom type is declared with a single element type, as validation requires.
+    element_types = {custom_type: rnd.choice(PRIMITIVE_TYPES) for custom_type in CUSTOM_TYPES}
+    args = []
+    for i in range(rnd.randint(2, 6)):
+        custom_type = rnd.choice(CUSTOM_TYPES)
+        arg_type = f'{custom_type}[{element_types[custom_type]}]'
+        args.append((f'node{i}', arg_type if rnd.random() < 0.5 else f'list[{arg_type}]'))
+    return _signature(args[0][1], 'solve', args)
+
+
+def _malformed(rnd: random.Random, size: int) -> str:
+    """Rejected inputs, including ones that made the former regex backtrack exponentially, and randomly
+    mutated signatures (most of which are rejected)."""
+    choice = rnd.randrange(5)
+    if choice == 0:
+        return 'int32 solve(' + 'a' * size  # Unclosed argument list.
+    if choice == 1:
+        return 'int32 solve(' + 'a:int32, ' * (size // 9) + '\n)'
+    if choice == 2:
+        return 'int32 solve(a:' + 'list[' * (size // 5) + 'int32)'  # Unclosed type brackets.
+    if choice == 3:
+        return 'int32 solve(' + ':' * size + ')'
+    signature = list(_wide(rnd, max(1, size // 20)))
+    for _ in range(3):
+        del signature[rnd.randrange(len(signature))]
+    return ''.join(signature)
+
+
+_GENERATORS = {
+    'typical': _typical,
+    'wide': _wide,
+    'deep': _deep,
+    'long_names': _long_names,
+    'custom': _custom,
+    'malformed': _malformed,
+}
@@ -0,0 +1,40 @@
+"""Measures the memory held by parsed signatures.
+
+Run from the repository root: python -m benchmarks.memory [--count 1000000]"""
+import argparse
+import gc
+import json
+import tracemalloc
+
+from benchmarks import corpus
+from problem_function_signature import signature as sig
+
+
+def bytes_per_signature(count: int) -> dict:
+    """Parses count typical signatures and reports the traced memory retained by the Signature objects,
+    excluding the input strings."""
+    signatures = corpus.generate('typical', count)
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    parsed = [sig.parse(signature) for signature in signatures]
+    gc.collect()
+    retained = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    assert len(parsed) == count
+    return {
+        'count': count,
+        'retained_bytes': retained,
+        'bytes_per_signature': retained / count,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--count', type=int, default=1000000)
+    args = parser.parse_args()
+    print(json.dumps(bytes_per_signature(args.count), indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,142 @@
+"""Offline benchmarks of parse, validate_type and to_dict with scaling-regression checks.
+
+Run from the repository root: python -m benchmarks.run [-o results.json] [--quick]
+Exits with status 1 if a scaling check fails, i.e. time grows faster than linearly with input size."""
+import argparse
+import json
+import platform
+import random
+import sys
+import time
+import tracemalloc
+from typing import Callable, Dict, List
+
+from benchmarks import corpus
+from problem_function_signature import signature as sig
+from problem_function_signature import type as tp
+
+# Sizes are multiplied by SCALING_FACTOR; time may grow at most SCALING_FACTOR * SCALING_TOLERANCE times.
+SCALING_FACTOR = 8
+SCALING_TOLERANCE = 2.0
+
+
+def _parse(signature: str):
+    try:
+        return sig.parse(signature)
+    except sig.ValidationException:
+        return None
+
+
+def measure(function: Callable, inputs: List) -> Dict:
+    """Calls function on every input, timing each call, then once more under tracemalloc."""
+    latencies = []
+    start = time.perf_counter()
+    for item in inputs:
+        call_start = time.perf_counter()
+        function(item)
+        latencies.append(time.perf_counter() - call_start)
+    total = time.perf_counter() - start
+
+    tracemalloc.start()
+    for item in inputs:
+        function(item)
+    peak_memory = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    latencies.sort()
+    return {
+        'calls': len(inputs),
+        'ops_per_sec': len(inputs) / total,
+        'latency_us': {f'p{p}': latencies[min(len(latencies) - 1, len(latencies) * p // 100)] * 1e6
+                       for p in (50, 90, 99)},
+        'latency_us_max': latencies[-1] * 1e6,
+        'peak_memory_bytes': peak_memory,
+    }
+
+
+def _best_time(function: Callable, item, repeat: int) -> float:
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function(item)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def scaling_check(name: str, function: Callable, make_input: Callable[[int], object], size: int,
+                  repeat: int) -> Dict:
+    small = _best_time(function, make_input(size), repeat)
+    large = _best_time(function, make_input(size * SCALING_FACTOR), repeat)
+    ratio = large / small
+    return {
+        'name': name,
+        'sizes': [size, size * SCALING_FACTOR],
+        'seconds': [small, large],
+        'ratio': ratio,
+        'max_ratio': SCALING_FACTOR * SCALING_TOLERANCE,
+        'passed': ratio <= SCALING_FACTOR * SCALING_TOLERANCE,
+    }
+
+
+def run(count: int, repeat: int) -> Dict:
+    results = {}
+    for kind in corpus.KINDS:
+        size = {'wide': 50, 'deep': 50, 'long_names': 200, 'malformed': 2000}.get(kind, 0)
+        signatures = corpus.generate(kind, count, size)
+        results[f'parse/{kind}'] = measure(_parse, signatures)
+
+    type_strings = [corpus.random_type(random.Random(i), depth) for i in range(count) for depth in (0, 2, 20)]
+    results['validate_type'] = measure(tp.validate_type, type_strings)
+
+    parsed = [sig.parse(signature) for signature in corpus.generate('typical', count)]
+    parsed += [sig.parse(signature) for signature in corpus.generate('custom', count)]
+    results['to_dict'] = measure(sig.Signature.to_dict, parsed)
+
+    def one(kind: str) -> Callable[[int], str]:
+        return lambda size: corpus.generate(kind, 1, size)[0]
+
+    checks = [
+        scaling_check('parse/wide', _parse, one('wide'), 250, repeat),
+        scaling_check('parse/deep', _parse, one('deep'), 100, repeat),
+        scaling_check('parse/long_names', _parse, one('long_names'), 1000, repeat),
+        scaling_check('parse/unclosed', _parse, lambda size: 'int32 f(' + 'a' * size, 1000, repeat),
+        scaling_check('parse/colons', _parse, lambda size: 'int32 f(' + ':' * size + ')', 1000, repeat),
+        scaling_check('validate_type/deep', tp.validate_type, lambda size: 'list[' * size + 'int32' + ']' * size,
+                      100, repeat),
+        scaling_check('to_dict/wide', sig.Signature.to_dict, lambda size: sig.parse(one('wide')(size)), 250,
+                      repeat),
+    ]
+    return {
+        'python': platform.python_version(),
+        'implementation': platform.python_implementation(),
+        'count': count,
+        'benchmarks': results,
+        'scaling': checks,
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('-o', '--output', help='write results as JSON to this file')
+    parser.add_argument('--count', type=int, default=2000, help='signatures per corpus')
+    parser.add_argument('--repeat', type=int, default=20, help='repetitions of each scaling measurement')
+    parser.add_argument('--quick', action='store_true', help='small corpora, for a smoke test')
+    args = parser.parse_args()
+    if args.quick:
+        args.count, args.repeat = 200, 5
+
+    report = run(args.count, args.repeat)
+    for name, result in report['benchmarks'].items():
+        print(f'{name:24} {result["ops_per_sec"]:12.0f} ops/s  p50 {result["latency_us"]["p50"]:8.1f} us  '
+              f'p99 {result["latency_us"]["p99"]:8.1f} us  peak {result["peak_memory_bytes"] / 1024:8.0f} KiB')
+    for check in report['scaling']:
+        print(f'{check["name"]:24} x{SCALING_FACTOR} size -> x{check["ratio"]:.1f} time  '
+              f'{"ok" if check["passed"] else "FAILED: superlinear"}')
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+    return 0 if all(check['passed'] for check in report['scaling']) else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
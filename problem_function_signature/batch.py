@@ -0,0 +1,110 @@
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional, Tuple, Union
+
+from . import signature as sig
+from .type import Type, validate_type
+
+
+class BatchStats(NamedTuple):
+    signatures: int
+    malformed: int
+    invalid: int  # Well-formed signatures that failed validation.
+    distinct_forms: int  # Canonical forms, see signature.canonical_form.
+    distinct_shapes: int  # Canonical forms without names.
+    distinct_types: int  # Canonical type strings, each validated once.
+
+
+class BatchResult(NamedTuple):
+    results: List[Union[sig.Signature, sig.ValidationException]]  # In input order.
+    forms: Dict[str, List[int]]  # Canonical form -> input indices with it, e.g. 'int32 f(a:list[int32])'.
+    shapes: Dict[str, List[int]]  # Types of the canonical form -> input indices, e.g. 'int32(list[int32])'.
+    stats: BatchStats
+
+
+def validate_batch(signatures: Iterable[str], allow_uppercase: Optional[bool] = None) -> BatchResult:
+    """Parses every signature like signature.parse, with the same results and exceptions, doing the work
+    shared by duplicates once: each canonical form is validated once, and so is each distinct type string.
+    Signatures that differ in whitespace have the same canonical form, and ones that differ only in names
+    have the same shape. Each input gets a Signature or exception of its own."""
+    if allow_uppercase is None:
+        allow_uppercase = sig.ALLOW_UPPERCASE_IN_NAMES
+    spellings = {}  # type: Dict[str, _Spelling]  # Exact repeats are not even tokenized again.
+    canonical_types = {}  # type: Dict[str, str]  # Type string -> canonical type string.
+    types = {}  # type: Dict[str, Tuple[Optional[Type], bool]]  # Canonical type string -> validate_type's result.
+    validated = {}  # Canonical form -> its Signature, copied for each input, or None if invalid.
+    forms = {}  # type: Dict[str, List[int]]
+    shapes = {}  # type: Dict[str, List[int]]
+    results = []
+    malformed = invalid = 0
+
+    def lookup_type(data_type: str) -> Tuple[Optional[Type], bool]:
+        """validate_type, once per canonical type string; _spelling has computed the canonical string."""
+        canonical_type = canonical_types[data_type]
+        result = types.get(canonical_type)
+        if result is None:
+            result = types[canonical_type] = validate_type(canonical_type)
+        return result
+
+    for index, signature in enumerate(signatures):
+        spelling = spellings.get(signature)
+        if spelling is None:
+            spelling = spellings[signature] = _spelling(signature, canonical_types, lookup_type, validated,
+                                                        allow_uppercase)
+            error = spelling.error
+        else:
+            error = spelling.error and type(spelling.error)(*spelling.error.args)  # Not shared: raising changes it.
+
+        if spelling.form is None:
+            malformed += 1
+        else:
+            forms.setdefault(spelling.form, []).append(index)
+            shapes.setdefault(spelling.shape, []).append(index)
+            invalid += error is not None
+        results.append(error if error is not None else _copy(validated[spelling.form]))
+
+    stats = BatchStats(len(results), malformed, invalid, len(forms), len(shapes), len(types))
+    return BatchResult(results, forms, shapes, stats)
+
+
+class _Spelling(NamedTuple):
+    form: Optional[str]  # None if malformed.
+    shape: Optional[str]
+    error: Optional[sig.ValidationException]
+
+
+def _spelling(signature: str, canonical_types: Dict[str, str], lookup_type: Callable,
+              validated: Dict[str, Optional[sig.Signature]], allow_uppercase: bool) -> _Spelling:
+    try:
+        names_and_types = sig._tokenize(signature)
+    except sig.ValidationException as e:
+        return _Spelling(None, None, e)
+    canonical = []
+    for _, data_type in names_and_types:
+        canonical_type = canonical_types.get(data_type)
+        if canonical_type is None:
+            canonical_type = canonical_types[data_type] = sig._canonical_type(data_type)
+        canonical.append(canonical_type)
+    form = _form(names_and_types, canonical)
+    shape = f'{canonical[0]}({",".join(canonical[1:])})'
+    if validated.get(form) is None:
+        # An invalid form is validated again for each spelling: the message quotes its types.
+        try:
+            validated[form] = sig.Signature(sig._validate(names_and_types, allow_uppercase, lookup_type=lookup_type))
+        except sig.ValidationException as e:
+            validated[form] = None
+            return _Spelling(form, shape, e)
+    return _Spelling(form, shape, None)
+
+
+def _copy(signature: sig.Signature) -> sig.Signature:
+    """Signature with its own args list; the Arguments in it are immutable and shared."""
+    copy = sig.Signature.__new__(sig.Signature)
+    copy.name = signature.name
+    copy.type = signature.type
+    copy.args = list(signature.args)
+    return copy
+
+
+def _form(names_and_types: List[Tuple[str, str]], canonical_types: List[str]) -> str:
+    """Same as signature._canonical_form, with the canonical types already computed."""
+    args = ','.join(f'{name}:{data_type}' for (name, _), data_type in zip(names_and_types[1:], canonical_types[1:]))
+    return f'{canonical_types[0]} {names_and_types[0][0]}({args})'
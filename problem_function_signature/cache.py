@@ -0,0 +1,173 @@
+import hashlib
+import json
+import sqlite3
+import threading
+from collections import OrderedDict
+from typing import NamedTuple, Optional
+
+from . import signature as sig
+from .type import _type_code, _unpickle_type, grammar_version
+
+# Of DiskParseCache entries. 1 keyed errors by fingerprint, which mixed up their messages; 2 stored
+# nested to_dict() results, which json.loads cannot read for deeply nested types.
+_FORMAT = '3'
+_ERROR_PREFIX = 'error:'  # Of DiskParseCache keys of errors, which are not fingerprints.
+
+_EXCEPTIONS = {exception.__name__: exception for exception in
+               (sig.ValidationException, sig.InvalidNameException, sig.InvalidTypeException)}
+
+
+class CacheStats(NamedTuple):
+    hits: int
+    misses: int
+    evictions: int
+    size: int
+    maxsize: int
+
+
+class ParseCache:
+    """Bounded LRU cache in front of signature.parse.
+
+    Keys are the tokenized signature, with the whitespace around names and types removed, so
+    'int32 f(a:int32)' and 'int32  f( a : int32 )' share an entry. Whitespace inside brackets is kept,
+    as error messages quote types as written: 'list[ int32 ]' and 'list[int32]' are separate entries.
+    Validation failures are cached too; each hit raises a new exception of the same type and message.
+    Each hit returns a new Signature, so mutating its args does not affect the cache.
+    Malformed signatures are rejected while the key is computed and are not cached.
+    One instance can be shared by threads; parsing runs outside the lock."""
+
+    def __init__(self, maxsize: int = 4096):
+        if maxsize < 1:
+            raise ValueError('maxsize must be positive')
+        self._maxsize = maxsize
+        self._entries = OrderedDict()  # key -> validated (name, Type) tuple or ValidationException.
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    def parse(self, signature: str, allow_uppercase: Optional[bool] = None) -> sig.Signature:
+        """Same as signature.parse."""
+        if allow_uppercase is None:
+            allow_uppercase = sig.ALLOW_UPPERCASE_IN_NAMES
+        names_and_types = sig._tokenize(signature)
+        # The result depends on the name rules in effect, so they are a part of the key.
+        key = (allow_uppercase, tuple(names_and_types))
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self._hits += 1
+            else:
+                self._misses += 1
+
+        if entry is None:
+            try:
+                entry = tuple(sig._validate(names_and_types, allow_uppercase))
+            except sig.ValidationException as e:
+                entry = e
+            self._store(key, entry)
+
+        if isinstance(entry, sig.ValidationException):
+            # Not the stored exception: raising it would attach the caller's traceback and context to it.
+            raise type(entry)(*entry.args)
+        return sig.Signature(list(entry))
+
+    def _store(self, key, entry):
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            if len(self._entries) > self._maxsize:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+
+    def stats(self) -> CacheStats:
+        with self._lock:
+            return CacheStats(self._hits, self._misses, self._evictions, len(self._entries), self._maxsize)
+
+    def clear(self):
+        """Removes all entries and resets the statistics."""
+        with self._lock:
+            self._entries.clear()
+            self._hits = self._misses = self._evictions = 0
+
+
+class DiskParseCache:
+    """Persistent parse cache in a sqlite file, shared by processes that use the same path.
+
+    Valid results are keyed by signature.fingerprint, so spellings with the same canonical form share
+    an entry, which stores each name with the code of its type (see type._type_code). The codes are
+    flat, so reading an entry does not recurse however deeply its types are nested. Validation errors are keyed by the tokenized signature,
+    like ParseCache's, as their messages quote types as written. All entries are dropped when the type
+    grammar version or the format of the entries changes. Instances can be pickled, e.g. to pass them to
+    signature.parse_many workers; the copy opens its own connection. One instance can be shared by threads."""
+
+    def __init__(self, path: str):
+        self._path = path
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._connection = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        with self._connection:
+            self._connection.execute('PRAGMA journal_mode=WAL')
+            self._connection.execute('CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)')
+            self._connection.execute('CREATE TABLE IF NOT EXISTS entries (fingerprint TEXT, uppercase INTEGER, '
+                                     'result TEXT, PRIMARY KEY (fingerprint, uppercase))')
+            meta = {'grammar_version': grammar_version(), 'format': _FORMAT}
+            if dict(self._connection.execute('SELECT key, value FROM meta')) != meta:
+                self._connection.execute('DELETE FROM entries')
+                self._connection.executemany('INSERT OR REPLACE INTO meta VALUES (?, ?)', meta.items())
+
+    def __getstate__(self):
+        return self._path
+
+    def __setstate__(self, path):
+        self.__init__(path)
+
+    def parse(self, signature: str, allow_uppercase: Optional[bool] = None) -> sig.Signature:
+        """Same as signature.parse."""
+        if allow_uppercase is None:
+            allow_uppercase = sig.ALLOW_UPPERCASE_IN_NAMES
+        names_and_types = sig._tokenize(signature)
+        # Spellings with the same canonical form are either all valid or all invalid, so a valid result
+        # under the fingerprint applies to this spelling; otherwise only an error of this spelling does.
+        valid_key = (sig._fingerprint(names_and_types), allow_uppercase)
+        error_key = (_ERROR_PREFIX + hashlib.sha256(json.dumps(names_and_types).encode('utf-8')).hexdigest(),
+                     allow_uppercase)
+        with self._lock:
+            row = self._connection.execute(
+                'SELECT result FROM entries WHERE uppercase = ? AND fingerprint IN (?, ?)',
+                (allow_uppercase, valid_key[0], error_key[0])).fetchone()
+            if row is not None:
+                self._hits += 1
+            else:
+                self._misses += 1
+
+        if row is not None:
+            result = json.loads(row[0])
+            if 'error' in result:
+                raise _EXCEPTIONS[result['error']['type']](result['error']['message'])
+            return sig.Signature([(name, _unpickle_type(code)) for name, code in result['result']])
+
+        try:
+            parsed = sig.Signature(sig._validate(names_and_types, allow_uppercase))
+        except sig.ValidationException as e:
+            self._store(error_key, json.dumps({'error': {'type': type(e).__name__, 'message': str(e)}}))
+            raise
+        names_and_codes = [(parsed.name, _type_code(parsed.type))] + [(arg.name, _type_code(arg.type))
+                                                                      for arg in parsed.args]
+        self._store(valid_key, json.dumps({'result': names_and_codes}))
+        return parsed
+
+    def _store(self, key, result: str):
+        with self._lock, self._connection:
+            self._connection.execute('INSERT OR REPLACE INTO entries VALUES (?, ?, ?)', key + (result,))
+
+    def stats(self) -> CacheStats:
+        with self._lock:
+            size = self._connection.execute('SELECT COUNT(*) FROM entries').fetchone()[0]
+            return CacheStats(self._hits, self._misses, 0, size, 0)
+
+    def close(self):
+        self._connection.close()
@@ -0,0 +1,225 @@
+"""Binary catalog of parsed signatures that is loaded lazily from a memory-mapped file.
+
+Layout (little-endian), each section directly after the previous one:
+    header          magic, format version, type count, string count, signature count
+    types           (name string id: u32, element type id or -1: i32) per type; elements come first
+    string offsets  u64 per string plus the end offset, relative to the string data
+    string data     UTF-8
+    record offsets  u64 per signature plus the end offset, relative to the record data
+    record data     (name string id, type id, argument count: u32) then (name string id, type id) per argument
+    name index      u32 signature indices sorted by the UTF-8 bytes of the function name
+
+Opening reads only the header; types are materialized on first use and signatures on access.
+A catalog can also be published in shared memory (Python 3.8+), so worker processes read the same pages."""
+import mmap
+import struct
+import sys
+from typing import Dict, Iterable, Iterator, List
+
+try:
+    from multiprocessing import shared_memory
+except ImportError:  # Python < 3.8.
+    shared_memory = None
+
+from .signature import Signature
+from .type import Type
+
+MAGIC = b'IKPFSCAT'
+FORMAT_VERSION = 1
+
+_HEADER = struct.Struct('<8sIIII')
+_TYPE = struct.Struct('<Ii')
+_OFFSET = struct.Struct('<Q')
+_RECORD = struct.Struct('<III')
+_ARGUMENT = struct.Struct('<II')
+_INDEX = struct.Struct('<I')
+
+
+class Catalog:
+    """Read-only sequence of Signatures backed by a buffer in the catalog format, e.g. an mmap."""
+
+    def __init__(self, buffer):
+        magic, version, type_count, string_count, signature_count = _HEADER.unpack_from(buffer, 0)
+        if magic != MAGIC:
+            raise ValueError('Not a signature catalog')
+        if version != FORMAT_VERSION:
+            raise ValueError(f'Unsupported signature catalog version {version}')
+        self._buffer = buffer
+        self._resource = None  # mmap or SharedMemory closed by close().
+        self._types = [None] * type_count
+        self._signature_count = signature_count
+
+        self._types_offset = _HEADER.size
+        self._string_offsets = self._types_offset + type_count * _TYPE.size
+        self._strings = self._string_offsets + (string_count + 1) * _OFFSET.size
+        self._record_offsets = self._strings + self._offset(self._string_offsets, string_count)
+        self._records = self._record_offsets + (signature_count + 1) * _OFFSET.size
+        self._name_index = self._records + self._offset(self._record_offsets, signature_count)
+
+    @classmethod
+    def open(cls, path: str) -> 'Catalog':
+        with open(path, 'rb') as f:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        catalog = cls(mapped)
+        catalog._resource = mapped
+        return catalog
+
+    @classmethod
+    def attach(cls, name: str) -> 'Catalog':
+        """Opens a catalog published with share_catalog, e.g. in a worker process, without copying it."""
+        if shared_memory is None:
+            raise RuntimeError('Shared memory requires Python 3.8 or later')
+        # Only the publisher unlinks the block. Before 3.13, attaching registers it with the resource tracker,
+        # which unlinks it if a process that does not share the publisher's tracker exits first.
+        block = shared_memory.SharedMemory(name, track=False) if sys.version_info >= (3, 13) else \
+            shared_memory.SharedMemory(name)
+        catalog = cls(block.buf)
+        catalog._resource = block
+        return catalog
+
+    def close(self):
+        if self._resource is not None:
+            self._buffer = None  # Shared memory cannot be closed while a view of it exists.
+            self._resource.close()
+            self._resource = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __len__(self):
+        return self._signature_count
+
+    def __getitem__(self, index: int) -> Signature:
+        if index < 0:
+            index += self._signature_count
+        if not 0 <= index < self._signature_count:
+            raise IndexError('catalog index out of range')
+        offset = self._records + self._offset(self._record_offsets, index)
+        name_id, type_id, arg_count = _RECORD.unpack_from(self._buffer, offset)
+        names_and_types = [(self._string(name_id), self._type(type_id))]
+        offset += _RECORD.size
+        for _ in range(arg_count):
+            name_id, type_id = _ARGUMENT.unpack_from(self._buffer, offset)
+            names_and_types.append((self._string(name_id), self._type(type_id)))
+            offset += _ARGUMENT.size
+        return Signature(names_and_types)
+
+    def __iter__(self) -> Iterator[Signature]:
+        for index in range(self._signature_count):
+            yield self[index]
+
+    def find(self, name: str) -> List[Signature]:
+        """Returns the signatures of functions with the given name, in catalog order. Binary search."""
+        key = name.encode('utf-8')
+        low, high = 0, self._signature_count
+        while low < high:
+            middle = (low + high) // 2
+            if self._indexed_name(middle) < key:
+                low = middle + 1
+            else:
+                high = middle
+        result = []
+        while low < self._signature_count and self._indexed_name(low) == key:
+            result.append(self[self._indexed(low)])
+            low += 1
+        return result
+
+    def _offset(self, table: int, index: int) -> int:
+        return _OFFSET.unpack_from(self._buffer, table + index * _OFFSET.size)[0]
+
+    def _string_bytes(self, string_id: int) -> bytes:
+        start = self._offset(self._string_offsets, string_id)
+        end = self._offset(self._string_offsets, string_id + 1)
+        return bytes(self._buffer[self._strings + start:self._strings + end])
+
+    def _string(self, string_id: int) -> str:
+        return self._string_bytes(string_id).decode('utf-8')
+
+    def _indexed(self, position: int) -> int:
+        return _INDEX.unpack_from(self._buffer, self._name_index + position * _INDEX.size)[0]
+
+    def _indexed_name(self, position: int) -> bytes:
+        offset = self._records + self._offset(self._record_offsets, self._indexed(position))
+        return self._string_bytes(_RECORD.unpack_from(self._buffer, offset)[0])
+
+    def _type(self, type_id: int) -> Type:
+        if self._types[type_id] is None:
+            # Iterative, as nesting may be deeper than the recursion limit.
+            chain = []
+            element_id = type_id
+            while element_id != -1 and self._types[element_id] is None:
+                chain.append(element_id)
+                element_id = _TYPE.unpack_from(self._buffer, self._types_offset + element_id * _TYPE.size)[1]
+            element_type = None if element_id == -1 else self._types[element_id]
+            for element_id in reversed(chain):
+                name_id = _TYPE.unpack_from(self._buffer, self._types_offset + element_id * _TYPE.size)[0]
+                element_type = self._types[element_id] = Type(self._string(name_id), element_type)
+        return self._types[type_id]
+
+
+def catalog_bytes(signatures: Iterable[Signature]) -> bytes:
+    """Serializes signatures into the catalog format."""
+    strings = {}  # type: Dict[str, int]
+    types = {}  # type: Dict[Type, int]
+    type_table = []
+    records = []
+    names = []
+
+    def string_id(string: str) -> int:
+        return strings.setdefault(string, len(strings))
+
+    def type_id(data_type: Type) -> int:
+        chain = []
+        while data_type is not None and data_type not in types:
+            chain.append(data_type)
+            data_type = data_type.element_type
+        for data_type in reversed(chain):
+            element_id = -1 if data_type.element_type is None else types[data_type.element_type]
+            types[data_type] = len(type_table)
+            type_table.append(_TYPE.pack(string_id(data_type.name), element_id))
+        return types[chain[0]] if chain else types[data_type]
+
+    for signature in signatures:
+        record = [_RECORD.pack(string_id(signature.name), type_id(signature.type), len(signature.args))]
+        record.extend(_ARGUMENT.pack(string_id(arg.name), type_id(arg.type)) for arg in signature.args)
+        records.append(b''.join(record))
+        names.append(signature.name.encode('utf-8'))
+
+    encoded_strings = [string.encode('utf-8') for string in strings]
+    name_index = sorted(range(len(names)), key=names.__getitem__)
+    return b''.join([
+        _HEADER.pack(MAGIC, FORMAT_VERSION, len(type_table), len(strings), len(records)),
+        *type_table,
+        *_offsets(encoded_strings),
+        *encoded_strings,
+        *_offsets(records),
+        *records,
+        *(_INDEX.pack(index) for index in name_index),
+    ])
+
+
+def write_catalog(path: str, signatures: Iterable[Signature]):
+    with open(path, 'wb') as f:
+        f.write(catalog_bytes(signatures))
+
+
+def share_catalog(signatures: Iterable[Signature]) -> 'shared_memory.SharedMemory':
+    """Publishes the catalog of signatures in a new shared memory block, which processes open with
+    Catalog.attach(block.name). The caller owns the block: it must close() and unlink() it when done."""
+    if shared_memory is None:
+        raise RuntimeError('Shared memory requires Python 3.8 or later')
+    data = catalog_bytes(signatures)
+    block = shared_memory.SharedMemory(create=True, size=len(data))
+    block.buf[:len(data)] = data
+    return block
+
+
+def _offsets(chunks: List[bytes]) -> Iterator[bytes]:
+    offset = 0
+    yield _OFFSET.pack(offset)
+    for chunk in chunks:
+        offset += len(chunk)
+        yield _OFFSET.pack(offset)
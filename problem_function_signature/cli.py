@@ -0,0 +1,76 @@
+"""Converts a file of signatures, one per line, to JSON Lines with one to_dict() object or error per line.
+With --serve, runs a parse server instead (see server.py)."""
+import argparse
+import json
+import sys
+import time
+from typing import Iterable, Iterator, List, Optional
+
+from . import signature as sig
+from .cache import DiskParseCache
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('input', nargs='?', default='-', help='file with signatures, - for stdin (default)')
+    parser.add_argument('-o', '--output', default='-', help='JSON Lines output file, - for stdout (default)')
+    parser.add_argument('-w', '--workers', type=int, default=0, help='number of worker processes')
+    parser.add_argument('--chunk-size', type=_positive_int, default=1000, help='signatures per worker task')
+    parser.add_argument('--cache', help='sqlite file with parse results shared between runs and workers')
+    parser.add_argument('--serve', metavar='SOCKET', help='run a parse server on this Unix socket, - for stdio')
+    parser.add_argument('--max-pending', type=_positive_int, default=64, help='requests in progress per server connection')
+    args = parser.parse_args(argv)
+
+    if args.serve:
+        from .server import serve  # Imports asyncio, which conversion does not need.
+        serve(None if args.serve == '-' else args.serve, args.workers, args.max_pending)
+        return 0
+
+    input_file = sys.stdin if args.input == '-' else open(args.input, encoding='utf-8')
+    output_file = sys.stdout if args.output == '-' else open(args.output, 'w', encoding='utf-8')
+    cache = DiskParseCache(args.cache) if args.cache else None
+    valid = invalid = 0
+    start = time.perf_counter()
+    try:
+        for signature, result in sig.parse_many(_signatures(input_file), args.workers, args.chunk_size, cache):
+            if isinstance(result, sig.ValidationException):
+                invalid += 1
+                line = json.dumps({'signature': signature,
+                                   'error': {'type': type(result).__name__, 'message': str(result)}})
+            else:
+                valid += 1
+                # Same as json.dumps of a dict with the to_dict() result, without building the dict.
+                line = f'{{"signature": {json.dumps(signature)}, "result": {result.to_json()}}}'
+            output_file.write(line + '\n')
+    finally:
+        if cache is not None:
+            cache.close()
+        if input_file is not sys.stdin:
+            input_file.close()
+        if output_file is not sys.stdout:
+            output_file.close()
+
+    elapsed = time.perf_counter() - start
+    total = valid + invalid
+    print(f'{total} signatures ({valid} valid, {invalid} invalid) in {elapsed:.2f}s, '
+          f'{total / elapsed if elapsed else 0:.0f} signatures/s', file=sys.stderr)
+    return 0
+
+
+def _positive_int(value: str) -> int:
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError(f'must be at least 1: {value}')
+    return number
+
+
+def _signatures(lines: Iterable[str]) -> Iterator[str]:
+    """Skips blank lines."""
+    for line in lines:
+        line = line.rstrip('\r\n')
+        if line.strip():
+            yield line
+
+
+if __name__ == '__main__':
+    sys.exit(main())
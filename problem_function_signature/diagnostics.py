@@ -0,0 +1,135 @@
+from typing import Callable, List, NamedTuple, Optional, Tuple, Type as Class
+
+from . import signature as sig
+from .type import registry, validate_type
+
+
+class Diagnostic(NamedTuple):
+    offset: int  # Of the offending text in the string passed to diagnose.
+    exception: Class[sig.ValidationException]  # What parse would raise for this problem.
+    message: str
+
+
+class _Segment(NamedTuple):
+    name: str
+    name_offset: int
+    data_type: str
+    type_offset: int
+
+
+def diagnose(signature: str, allow_uppercase: Optional[bool] = None) -> List[Diagnostic]:
+    """Returns every problem of the signature in one pass; an empty list if parse would accept it.
+
+    Problems are reported in the order parse checks them, so the first one is what parse raises:
+    malformed argument lists, then the name and the type of the function and of each argument, then
+    repeated names, conflicting custom type declarations and names that are type names. Only a
+    signature that is malformed as a whole stops the pass. allow_uppercase is as in parse."""
+    if allow_uppercase is None:
+        allow_uppercase = sig.ALLOW_UPPERCASE_IN_NAMES
+    diagnostics = []
+    segments = _split(signature, diagnostics)
+    if segments is None:
+        return diagnostics
+
+    checked = []  # (name or None, Type or None, segment); None where invalid.
+    for i, segment in enumerate(segments):
+        name = segment.name
+        if not sig._validate_name(name, allow_uppercase):
+            _report(diagnostics, segment.name_offset, sig._raise_invalid_name_exception, name, i)
+            name = None
+        data_type = validate_type(segment.data_type)[0]
+        if data_type is None:
+            _report(diagnostics, segment.type_offset, sig._raise_invalid_type_exception, segment.data_type)
+        checked.append((name, data_type, segment))
+
+    first_occurrences = {}  # Name -> index of its first occurrence.
+    duplicates = []
+    for i, (name, _, segment) in enumerate(checked):
+        if name is not None and first_occurrences.setdefault(name, i) != i:
+            duplicates.append((first_occurrences[name], segment.name_offset, name))
+    for _, offset, name in sorted(duplicates):
+        diagnostics.append(Diagnostic(offset, sig.InvalidNameException,
+                                      f'"{name}" appears more than once among function and argument names'))
+
+    first_declarations = {}  # Custom type name -> (index of its first declaration, Type).
+    conflicts = []
+    for i, (_, data_type, segment) in enumerate(checked):
+        if data_type is not None and data_type.custom:
+            first = first_declarations.setdefault(data_type.name, (i, data_type))
+            if first[1] != data_type:
+                conflicts.append((first[0], segment.type_offset, data_type.name))
+    for _, offset, type_name in sorted(conflicts):
+        diagnostics.append(Diagnostic(offset, sig.InvalidTypeException, f'Two declarations of custom type {type_name}'))
+
+    for name, _, segment in checked:
+        if name in registry:
+            diagnostics.append(Diagnostic(segment.name_offset, sig.InvalidNameException,
+                                          f'"{name}" matches a type name; that is not acceptable for a name'))
+    return diagnostics
+
+
+def _report(diagnostics: List[Diagnostic], offset: int, raise_exception: Callable, *args):
+    try:
+        raise_exception(*args)
+    except sig.ValidationException as e:
+        diagnostics.append(Diagnostic(offset, type(e), str(e)))
+
+
+def _split(signature: str, diagnostics: List[Diagnostic]) -> Optional[List[_Segment]]:
+    """Same splitting as signature._tokenize, keeping offsets and recovering from malformed arguments:
+    an argument segment without the comma before the next name is split at its last whitespace."""
+    start = len(signature) - len(signature.lstrip())
+    end = start + len(signature.strip())
+    open_paren = signature.rfind('(', start, end - 1)
+    split_space = signature.rfind(' ', start + 1, open_paren - 1) if open_paren > start + 2 else -1
+    if split_space == -1 or not signature.endswith(')', start, end) or '\n' in signature[start:end]:
+        newline = signature.find('\n', start, end)
+        offset = newline if newline != -1 else (end if not signature.endswith(')', start, end) else start)
+        diagnostics.append(Diagnostic(offset, sig.ValidationException, 'Malformed function signature'))
+        return None
+
+    segments = [_Segment(*_stripped(signature, split_space + 1, open_paren), *_stripped(signature, start, split_space))]
+    if signature[open_paren + 1:end - 1].strip() == '':
+        return segments
+
+    pieces = []  # (start, end) of the text between colons.
+    piece_start = open_paren + 1
+    colon = signature.find(':', piece_start, end - 1)
+    while colon != -1:
+        pieces.append((piece_start, colon))
+        piece_start = colon + 1
+        colon = signature.find(':', piece_start, end - 1)
+    pieces.append((piece_start, end - 1))
+    if len(pieces) == 1:
+        diagnostics.append(Diagnostic(_stripped(signature, *pieces[0])[1], sig.ValidationException,
+                                      'Invalid format of function arguments'))
+        return segments
+
+    name_span = pieces[0]
+    for piece_start, piece_end in pieces[1:-1]:
+        comma = signature.rfind(',', piece_start, piece_end)
+        if comma == -1:
+            diagnostics.append(Diagnostic(_stripped(signature, piece_start, piece_end)[1], sig.ValidationException,
+                                          'Invalid format of function arguments'))
+            comma = _last_space(signature, piece_start, piece_end)
+        segments.append(_Segment(*_stripped(signature, *name_span), *_stripped(signature, piece_start, comma)))
+        name_span = (min(comma + 1, piece_end), piece_end)
+    segments.append(_Segment(*_stripped(signature, *name_span), *_stripped(signature, *pieces[-1])))
+    return segments
+
+
+def _stripped(signature: str, start: int, end: int) -> Tuple[str, int]:
+    """Returns signature[start:end] stripped, and the offset where the stripped text begins."""
+    text = signature[start:end]
+    stripped = text.lstrip()
+    return stripped.rstrip(), start + len(text) - len(stripped)
+
+
+def _last_space(signature: str, start: int, end: int) -> int:
+    """Returns the position of the last whitespace that follows other text in signature[start:end], or
+    end if there is none, so the whole text is taken as the type and the next name is empty."""
+    text = signature[start:end].rstrip()
+    for position in range(len(text) - 1, 0, -1):
+        if text[position].isspace():
+            return start + position
+    return end
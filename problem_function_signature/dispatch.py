@@ -0,0 +1,140 @@
+"""Selects a handler for a Type by its shape, e.g. for per-type branches of code generators:
+
+    declare = TypeDispatcher(default=declare_other)
+    declare.register('list[list[*]]', declare_matrix)
+    declare.register('LinkedListNode[primitive]', declare_list_node)
+    declare.register('int64', declare_long)
+    declare(data_type, language)  # Calls the handler of the first matching pattern with the same arguments.
+
+Patterns have the syntax of types with three wildcards: '*' matches any type, 'primitive' any primitive
+type and 'custom[...]' any custom type whose element type matches the pattern in brackets."""
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+from .type import Type, registry
+
+_ANY = '*'
+_PRIMITIVE = 'primitive'
+_CUSTOM = 'custom'
+_NO_MATCH = object()
+
+
+class _Node:
+    """State of the decision trie after matching the outermost levels of a type. Fields other than children
+    hold the index of the first registered pattern that ends there."""
+    __slots__ = ('children', 'custom', 'any', 'primitive', 'exact')
+
+    def __init__(self):
+        self.children = {}  # type: Dict[str, _Node]  # By type name of the next level.
+        self.custom = None  # type: Optional[_Node]  # Next level of 'custom[...]'.
+        self.any = None  # '*' at this level.
+        self.primitive = None  # 'primitive' at this level.
+        self.exact = None  # Pattern ending with the primitive type name that led to this node.
+
+
+class TypeDispatcher:
+    """Handlers registered against type patterns. The first registered pattern that matches a type wins.
+
+    Patterns are compiled into a trie that is walked once per distinct Type; the result is memoized by the
+    interned Type, so later lookups of the same type are a dict lookup. Registering a pattern rebuilds
+    the trie and clears the memo; lookups from several threads need no lock."""
+
+    def __init__(self, default=None):
+        """default is returned by resolve for types that match no pattern; if None, resolve raises LookupError."""
+        self._default = default
+        self._lock = threading.Lock()
+        self._handlers = []  # type: List[Any]
+        self._patterns = []  # type: List[Tuple[str, ...]]
+        self._compiled = (_Node(), {})  # Trie and memo, replaced together.
+
+    def register(self, pattern: str, handler=None):
+        """Registers handler for types matching the pattern. Without handler, returns a decorator."""
+        if handler is None:
+            def decorator(function):
+                self.register(pattern, function)
+                return function
+            return decorator
+
+        steps = _parse_pattern(pattern)
+        with self._lock:
+            self._handlers.append(handler)
+            self._patterns.append(steps)
+            self._compiled = (_compile(self._patterns), {})
+
+    def resolve(self, data_type: Type):
+        trie, memo = self._compiled
+        handler = memo.get(data_type)
+        if handler is None:
+            index = _match(trie, data_type)
+            handler = memo[data_type] = _NO_MATCH if index is None else self._handlers[index]
+        if handler is _NO_MATCH:
+            if self._default is None:
+                raise LookupError(f'No handler for type {data_type}')
+            return self._default
+        return handler
+
+    def __call__(self, data_type: Type, *args, **kwargs):
+        return self.resolve(data_type)(data_type, *args, **kwargs)
+
+
+def _parse_pattern(pattern: str) -> Tuple[str, ...]:
+    """Returns the names and wildcards of the pattern, outermost first."""
+    steps = []
+    rest = pattern.strip()
+    while rest.endswith(']') and '[' in rest:
+        head, _, rest = rest.partition('[')
+        head = head.strip()
+        if head != _CUSTOM and not registry.composite(head):
+            raise ValueError(f'Invalid type pattern: {pattern}')
+        steps.append(head)
+        rest = rest[:-1].strip()
+    if rest != _ANY and rest != _PRIMITIVE and not registry.primitive(rest):
+        raise ValueError(f'Invalid type pattern: {pattern}')
+    steps.append(rest)
+    return tuple(steps)
+
+
+def _compile(patterns: List[Tuple[str, ...]]) -> _Node:
+    root = _Node()
+    for index, steps in enumerate(patterns):
+        node = root
+        for step in steps[:-1]:
+            if step == _CUSTOM:
+                if node.custom is None:
+                    node.custom = _Node()
+                node = node.custom
+            else:
+                node = node.children.setdefault(step, _Node())
+        last = steps[-1]
+        if last == _ANY:
+            node.any = index if node.any is None else node.any
+        elif last == _PRIMITIVE:
+            node.primitive = index if node.primitive is None else node.primitive
+        else:
+            node = node.children.setdefault(last, _Node())
+            node.exact = index if node.exact is None else node.exact
+    return root
+
+
+def _match(root: _Node, data_type: Type) -> Optional[int]:
+    """Returns the index of the first registered pattern that matches, or None. Iterative, as types may be
+    nested deeper than the recursion limit; branches only where both a name and 'custom[...]' match."""
+    best = None
+    stack = [(root, data_type)]
+    while stack:
+        node, data_type = stack.pop()
+        candidates = [node.any]
+        child = node.children.get(data_type.name)
+        if data_type.primitive:
+            candidates.append(node.primitive)
+            if child is not None:
+                candidates.append(child.exact)
+        else:
+            if child is not None:
+                stack.append((child, data_type.element_type))
+            if data_type.custom and node.custom is not None:
+                stack.append((node.custom, data_type.element_type))
+        for index in candidates:
+            if index is not None and (best is None or index < best):
+                best = index
+    return best
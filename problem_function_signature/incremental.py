@@ -0,0 +1,99 @@
+from collections import Counter
+from typing import List, NamedTuple, Optional
+
+from . import signature as sig
+from .type import Type, registry, validate_type
+
+
+class _Segment(NamedTuple):
+    """Validation result of one (name, type) segment, independent of its position."""
+    name: str
+    data_type: str
+    valid_name: bool
+    type: Optional[Type]  # None if data_type is invalid.
+
+
+class IncrementalParser:
+    """Parses successive versions of a signature that is being edited, e.g. on every keystroke in an
+    authoring tool, re-validating only the segments that changed since the previous version.
+
+    Each version is tokenized (a few linear string scans), then compared with the previous one segment
+    by segment: only segments between the unchanged prefix and suffix are validated again, and the
+    counts behind the checks across arguments (duplicate names, conflicting custom types, names that
+    are type names) are updated for those segments only. Results and exceptions are the same as
+    signature.parse's. An instance holds the state of one signature, so it must not be shared by threads."""
+
+    def __init__(self):
+        self._allow_uppercase = None  # Name rules the segments were validated with.
+        self._segments = []  # type: List[_Segment]
+        self._invalid = 0  # Segments with an invalid name or type.
+        self._name_counts = Counter()
+        self._duplicate_names = 0  # Names that appear more than once.
+        self._custom_types = {}  # Custom type name -> Counter of its declarations.
+        self._custom_conflicts = 0  # Custom type names declared with more than one element type.
+        self._type_name_clashes = 0  # Segments named like a type.
+
+    def parse(self, signature: str, allow_uppercase: Optional[bool] = None) -> sig.Signature:
+        """Same as signature.parse."""
+        if allow_uppercase is None:
+            allow_uppercase = sig.ALLOW_UPPERCASE_IN_NAMES
+        names_and_types = sig._tokenize(signature)
+        if self._allow_uppercase != allow_uppercase:
+            self.__init__()  # Name rules changed, nothing can be reused.
+            self._allow_uppercase = allow_uppercase
+
+        old = self._segments
+        limit = min(len(old), len(names_and_types))
+        prefix = 0
+        while prefix < limit and old[prefix][:2] == names_and_types[prefix]:
+            prefix += 1
+        suffix = 0
+        while suffix < limit - prefix and old[-1 - suffix][:2] == names_and_types[-1 - suffix]:
+            suffix += 1
+
+        for segment in old[prefix:len(old) - suffix]:
+            self._count(segment, -1)
+        changed = [self._validate_segment(name, data_type)
+                   for name, data_type in names_and_types[prefix:len(names_and_types) - suffix]]
+        for segment in changed:
+            self._count(segment, 1)
+        self._segments = old[:prefix] + changed + old[len(old) - suffix:]
+
+        if self._invalid or self._duplicate_names or self._custom_conflicts or self._type_name_clashes:
+            self._raise_first_error()
+        return sig.Signature([(segment.name, segment.type) for segment in self._segments])
+
+    def _validate_segment(self, name: str, data_type: str) -> _Segment:
+        valid_name = sig._validate_name(name, self._allow_uppercase)
+        return _Segment(name, data_type, valid_name, validate_type(data_type)[0] if valid_name else None)
+
+    def _count(self, segment: _Segment, delta: int):
+        """Adds (delta 1) or removes (delta -1) the segment from the counts behind the checks."""
+        if not segment.valid_name or segment.type is None:
+            self._invalid += delta
+            return
+
+        count = self._name_counts[segment.name] + delta
+        if count:
+            self._name_counts[segment.name] = count
+        else:
+            del self._name_counts[segment.name]
+        if (count == 2 and delta == 1) or (count == 1 and delta == -1):
+            self._duplicate_names += delta
+        if segment.name in registry:
+            self._type_name_clashes += delta
+
+        if segment.type.custom:
+            declarations = self._custom_types.setdefault(segment.type.name, Counter())
+            conflicting = len(declarations) > 1
+            declarations[segment.type] += delta
+            if not declarations[segment.type]:
+                del declarations[segment.type]
+            self._custom_conflicts += (len(declarations) > 1) - conflicting
+
+    def _raise_first_error(self):
+        """Raises the exception parse would, running parse's checks with the types validated already."""
+        types = {segment.data_type: (segment.type, segment.type is not None)
+                 for segment in self._segments if segment.valid_name}
+        sig._validate([segment[:2] for segment in self._segments], self._allow_uppercase,
+                      lookup_type=types.__getitem__)
@@ -0,0 +1,101 @@
+import threading
+from typing import Dict, FrozenSet, Hashable, Iterable, Optional, Set, Tuple
+
+from .signature import Signature
+from .type import Type
+
+
+class SignatureIndex:
+    """In-memory index of parsed signatures by the types they use, for queries over a problem bank.
+
+    Signatures are added under a key, e.g. a problem id. Every query returns a new set of the keys of
+    the matching signatures and takes time proportional to its size; sets of several queries can be
+    intersected. Each signature is indexed under a posting list per distinct term it contains, so
+    adding or removing one takes time proportional to its argument count and custom type count.
+    Queries match the signature as it was when added; add it again after changing it."""
+
+    def __init__(self, signatures: Iterable[Tuple[Hashable, Signature]] = ()):
+        self._signatures = {}  # type: Dict[Hashable, Signature]
+        self._terms = {}  # type: Dict[Hashable, FrozenSet[tuple]]  # Of each signature when it was added.
+        self._postings = {}  # type: Dict[tuple, Set[Hashable]]
+        self._lock = threading.Lock()
+        for key, signature in signatures:
+            self.add(key, signature)
+
+    def add(self, key: Hashable, signature: Signature):
+        """Indexes the signature under key, replacing the signature previously added under it."""
+        with self._lock:
+            terms = frozenset(_terms(signature))
+            if key in self._signatures:
+                self._remove(key)
+            self._signatures[key] = signature
+            self._terms[key] = terms
+            for term in terms:
+                self._postings.setdefault(term, set()).add(key)
+
+    def remove(self, key: Hashable):
+        """Raises KeyError if no signature was added under key."""
+        with self._lock:
+            self._remove(key)
+
+    def _remove(self, key: Hashable):
+        # The stored terms, not the signature's current ones: the caller may have changed its args since.
+        del self._signatures[key]
+        for term in self._terms.pop(key):
+            keys = self._postings[term]
+            keys.discard(key)
+            if not keys:
+                del self._postings[term]
+
+    def __len__(self):
+        return len(self._signatures)
+
+    def __contains__(self, key):
+        return key in self._signatures
+
+    def __getitem__(self, key: Hashable) -> Signature:
+        return self._signatures[key]
+
+    def taking(self, data_type: Type) -> Set[Hashable]:
+        """Signatures with an argument of exactly this type."""
+        return self._lookup(('takes', data_type))
+
+    def returning(self, data_type: Type) -> Set[Hashable]:
+        return self._lookup(('returns', data_type))
+
+    def taking_outer(self, type_name: str) -> Set[Hashable]:
+        """Signatures with an argument of a type with this outermost name, e.g. 'list' for list[...]."""
+        return self._lookup(('takes_outer', type_name))
+
+    def returning_outer(self, type_name: str) -> Set[Hashable]:
+        return self._lookup(('returns_outer', type_name))
+
+    def with_leaf(self, primitive_type: Type) -> Set[Hashable]:
+        """Signatures whose return type or any argument type has this innermost primitive type."""
+        return self._lookup(('leaf', primitive_type))
+
+    def with_arity(self, arg_count: int) -> Set[Hashable]:
+        return self._lookup(('arity', arg_count))
+
+    def using_custom(self, type_name: Optional[str] = None) -> Set[Hashable]:
+        """Signatures using this custom type, or any custom type if type_name is None, at any nesting level."""
+        return self._lookup(('custom', type_name))
+
+    def _lookup(self, term: tuple) -> Set[Hashable]:
+        with self._lock:
+            return set(self._postings.get(term, ()))
+
+
+def _terms(signature: Signature) -> Set[tuple]:
+    terms = {('returns', signature.type), ('returns_outer', signature.type.name), ('arity', len(signature.args))}
+    data_types = {signature.type}
+    for arg in signature.args:
+        terms.add(('takes', arg.type))
+        terms.add(('takes_outer', arg.type.name))
+        data_types.add(arg.type)
+    for data_type in data_types:
+        terms.add(('leaf', data_type.leaf_type))
+        for type_name in data_type.custom_type_names:
+            terms.add(('custom', type_name))
+            terms.add(('custom', None))
+    return terms
@@ -0,0 +1,78 @@
+"""Opt-in timing and counters for signature.parse.
+
+While disabled, parse only checks that `collector` is None, so this can stay in production builds:
+
+    stats = instrumentation.enable(hook=print)  # The hook receives a ParseRecord after every parse.
+    ...
+    instrumentation.disable()
+    stats.phase_seconds['types']
+"""
+import threading
+from typing import Callable, Dict, NamedTuple, Optional
+
+# Phases of the parse pipeline, in order.
+PHASES = ('tokenize', 'names', 'types', 'duplicate_names', 'custom_types', 'type_names')
+
+
+class ParseRecord(NamedTuple):
+    """Measurements of a single parse."""
+    signature: str
+    phase_seconds: Dict[str, float]
+    phase_calls: Dict[str, int]
+    arg_count: int
+    nesting_depth: int  # Of the most deeply nested type that was validated.
+    exception: Optional[Exception]
+
+
+class ParseStats:
+    """Cumulative measurements of all parses since instrumentation was enabled."""
+
+    def __init__(self, hook: Optional[Callable[[ParseRecord], None]] = None):
+        self.hook = hook
+        self.parses = 0
+        self.failures = 0
+        self.phase_seconds = dict.fromkeys(PHASES, 0.0)
+        self.phase_calls = dict.fromkeys(PHASES, 0)
+        self.max_arg_count = 0
+        self.max_nesting_depth = 0
+        self._lock = threading.Lock()
+
+    def add(self, record: ParseRecord):
+        with self._lock:
+            self.parses += 1
+            self.failures += record.exception is not None
+            for phase in PHASES:
+                self.phase_seconds[phase] += record.phase_seconds[phase]
+                self.phase_calls[phase] += record.phase_calls[phase]
+            self.max_arg_count = max(self.max_arg_count, record.arg_count)
+            self.max_nesting_depth = max(self.max_nesting_depth, record.nesting_depth)
+        if self.hook is not None:
+            self.hook(record)
+
+    def to_dict(self):
+        with self._lock:
+            return {
+                'parses': self.parses,
+                'failures': self.failures,
+                'phase_seconds': dict(self.phase_seconds),
+                'phase_calls': dict(self.phase_calls),
+                'max_arg_count': self.max_arg_count,
+                'max_nesting_depth': self.max_nesting_depth,
+            }
+
+
+collector = None  # type: Optional[ParseStats]
+
+
+def enable(hook: Optional[Callable[[ParseRecord], None]] = None) -> ParseStats:
+    """Starts collecting into a new ParseStats, which is returned."""
+    global collector
+    collector = ParseStats(hook)
+    return collector
+
+
+def disable() -> Optional[ParseStats]:
+    """Stops collecting and returns the stats collected so far, if any."""
+    global collector
+    stats, collector = collector, None
+    return stats
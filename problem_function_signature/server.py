@@ -0,0 +1,195 @@
+"""Long-running parse server that keeps the parser and its cache warm between requests.
+
+Requests and responses are JSON Lines, on a Unix socket or on stdin/stdout:
+
+    {"id": 1, "signatures": ["int32 f(a:int32)", "int32 f(a)"], "allow_uppercase": true}
+    {"id": 1, "results": [{"result": <to_dict()>}, {"error": {"type": "ValidationException", "message": "..."}}]}
+    {"id": 2, "stats": true}
+    {"id": 2, "stats": {"requests": 1, ...}}
+
+allow_uppercase is optional and defaults to signature.ALLOW_UPPERCASE_IN_NAMES. A client can send
+requests without waiting for responses; they are processed concurrently and each response is written
+as soon as it is ready, so responses can arrive out of order. A connection stops being read while
+max_pending of its requests are in progress, which makes a fast client wait for the server.
+Batches are parsed in a pool of worker processes, or in a thread if workers is 0 or 1."""
+import asyncio
+import json
+import multiprocessing
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import List, Optional, Tuple
+
+from . import signature as sig
+from .cache import ParseCache
+
+_LINE_LIMIT = 1 << 24  # Longest request line, in bytes.
+
+_cache = ParseCache()  # One per process: the server's, or each worker's.
+
+
+class ParseServer:
+    """Serves the protocol above on any number of connections, sharing one worker pool."""
+
+    def __init__(self, workers: int = 0, max_pending: int = 64):
+        if max_pending < 1:
+            raise ValueError('max_pending must be positive')
+        self._workers = workers
+        self._max_pending = max_pending
+        self._executor = _process_pool(workers) if workers > 1 else ThreadPoolExecutor(1)
+        self._start = time.time()
+        self._connections = 0
+        self._requests = 0
+        self._signatures = 0
+        self._invalid = 0
+        self._in_flight = 0
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """Serves one connection until the client closes it."""
+        self._connections += 1
+        pending = asyncio.Semaphore(self._max_pending)
+        write_lock = asyncio.Lock()
+        tasks = set()
+        try:
+            while True:
+                await pending.acquire()
+                try:
+                    line = await reader.readline()
+                except ValueError:  # Longer than _LINE_LIMIT; the rest of the stream cannot be framed.
+                    await self._write(writer, write_lock, _error_response(None, 'Request line is too long'))
+                    break
+                if not line:
+                    break
+                task = asyncio.ensure_future(self._respond(line, writer, write_lock))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+                task.add_done_callback(lambda _: pending.release())
+            if tasks:
+                await asyncio.wait(tasks)
+        except ConnectionError:
+            pass
+        finally:
+            self._connections -= 1
+            writer.close()
+
+    async def _respond(self, line: bytes, writer: asyncio.StreamWriter, write_lock: asyncio.Lock):
+        self._in_flight += 1
+        try:
+            response = await self._response(line)
+        except Exception as e:  # E.g. a worker process died; the client still gets a response.
+            response = _error_response(None, f'{type(e).__name__}: {e}')
+        finally:
+            self._in_flight -= 1
+        await self._write(writer, write_lock, response)
+
+    async def _response(self, line: bytes) -> str:
+        request_id = None
+        try:
+            request = json.loads(line.decode('utf-8'))
+            if not isinstance(request, dict):
+                raise ValueError('Request must be a JSON object')
+            request_id = request.get('id')
+            if request.get('stats'):
+                return json.dumps({'id': request_id, 'stats': self.stats()})
+            signatures = request.get('signatures')
+            if not isinstance(signatures, list) or not all(isinstance(s, str) for s in signatures):
+                raise ValueError('"signatures" must be a list of strings')
+            allow_uppercase = request.get('allow_uppercase')
+            if allow_uppercase is not None and not isinstance(allow_uppercase, bool):
+                raise ValueError('"allow_uppercase" must be a boolean')
+        except ValueError as e:  # Includes JSON and UTF-8 decoding errors.
+            return _error_response(request_id, str(e))
+
+        self._requests += 1
+        results, invalid = await asyncio.get_event_loop().run_in_executor(
+            self._executor, _parse_batch, signatures, allow_uppercase)
+        self._signatures += len(signatures)
+        self._invalid += invalid
+        return f'{{"id": {json.dumps(request_id)}, "results": [{", ".join(results)}]}}'
+
+    @staticmethod
+    async def _write(writer: asyncio.StreamWriter, write_lock: asyncio.Lock, response: str):
+        async with write_lock:  # drain() must not be awaited by two tasks at once.
+            writer.write(response.encode('utf-8') + b'\n')
+            await writer.drain()
+
+    def stats(self) -> dict:
+        return {
+            'uptime_seconds': time.time() - self._start,
+            'workers': self._workers,
+            'connections': self._connections,
+            'requests': self._requests,
+            'in_flight': self._in_flight,
+            'signatures': self._signatures,
+            'invalid': self._invalid,
+            # Worker processes have caches of their own.
+            'cache': _cache.stats()._asdict() if self._workers <= 1 else None,
+        }
+
+    async def serve_unix(self, path: str) -> asyncio.AbstractServer:
+        """Starts accepting connections on a Unix socket and returns the asyncio server."""
+        return await asyncio.start_unix_server(self.handle, path, limit=_LINE_LIMIT)
+
+    async def serve_stdio(self):
+        """Serves requests from stdin on stdout until stdin is closed. Both must be pipes or terminals."""
+        loop = asyncio.get_event_loop()
+        reader = asyncio.StreamReader(limit=_LINE_LIMIT, loop=loop)
+        await loop.connect_read_pipe(lambda: asyncio.StreamReaderProtocol(reader, loop=loop), sys.stdin)
+        transport, protocol = await loop.connect_write_pipe(asyncio.streams.FlowControlMixin, sys.stdout)
+        await self.handle(reader, asyncio.StreamWriter(transport, protocol, reader, loop))
+
+    def close(self):
+        self._executor.shutdown()
+
+
+def serve(path: Optional[str] = None, workers: int = 0, max_pending: int = 64):
+    """Runs a ParseServer on a Unix socket at path until interrupted, or on stdin/stdout if path is None."""
+    loop = asyncio.new_event_loop()  # get_event_loop() without a running loop is deprecated since Python 3.12.
+    asyncio.set_event_loop(loop)
+    server = ParseServer(workers, max_pending)
+    try:
+        if path is None:
+            loop.run_until_complete(server.serve_stdio())
+        else:
+            unix_server = loop.run_until_complete(server.serve_unix(path))
+            try:
+                loop.run_forever()
+            except KeyboardInterrupt:
+                pass
+            finally:
+                unix_server.close()
+                loop.run_until_complete(unix_server.wait_closed())
+    finally:
+        server.close()
+        asyncio.set_event_loop(None)
+        loop.close()
+
+
+def _process_pool(workers: int) -> ProcessPoolExecutor:
+    """Worker processes must not be forked while connections are open: they would inherit the sockets,
+    and closing a connection would not reach the client. Workers are forked from a fork server, which
+    needs Python 3.7, and the pool is started here, before connections are accepted; before Python 3.9,
+    that starts all workers."""
+    if sys.version_info >= (3, 7):
+        executor = ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context('forkserver'))
+    else:
+        executor = ProcessPoolExecutor(workers)
+    executor.submit(int).result()
+    return executor
+
+
+def _parse_batch(signatures: List[str], allow_uppercase: Optional[bool]) -> Tuple[List[str], int]:
+    """Runs in the executor. Returns the JSON of each result and the number of invalid signatures."""
+    results = []
+    invalid = 0
+    for signature in signatures:
+        try:
+            results.append(f'{{"result": {_cache.parse(signature, allow_uppercase=allow_uppercase).to_json()}}}')
+        except sig.ValidationException as e:
+            invalid += 1
+            results.append(json.dumps({'error': {'type': type(e).__name__, 'message': str(e)}}))
+    return results, invalid
+
+
+def _error_response(request_id, message: str) -> str:
+    return json.dumps({'id': request_id, 'error': {'type': 'RequestError', 'message': message}})
@@ -1,8 +1,18 @@
+import functools
+import hashlib
+import itertools
 import re
-from typing import NamedTuple, List, Tuple
+import sys
+import time
+from collections import deque
+from json.encoder import encode_basestring_ascii
+from typing import NamedTuple, List, Tuple, Iterable, Iterator, Optional, Union
 
-from .type import Type, all_type_names, validate_type, composite_type_names
+from . import instrumentation
+from .type import Type, registry, validate_type
 
+# Default for the allow_uppercase argument of parse and the other entry points. Every call reads it
+# once, so changing it does not affect calls in progress; pass allow_uppercase to not depend on it.
 ALLOW_UPPERCASE_IN_NAMES = True
 
 
@@ -12,10 +22,22 @@ class Argument(NamedTuple):
 
 
 class Signature:
+    # Types are interned and names are interned strings, so a signature costs its own slots,
+    # the args list and one Argument tuple per argument.
+    __slots__ = ('name', 'type', 'args')
+
     def __init__(self, names_and_types: List[Tuple[str, Type]]):
-        self.name = names_and_types[0][0]
+        self.name = sys.intern(names_and_types[0][0])
         self.type = names_and_types[0][1]
-        self.args = [Argument(i[0], i[1]) for i in names_and_types[1:]]
+        self.args = [Argument(sys.intern(i[0]), i[1]) for i in names_and_types[1:]]
+
+    def __reduce__(self):
+        return _unpickle_signature, (self.name, self.type, tuple(arg.name for arg in self.args),
+                                     tuple(arg.type for arg in self.args))
+
+    def validate(self) -> 'Signature':
+        """Runs any validation that was deferred (see LazySignature) and returns self."""
+        return self
 
     def to_dict(self):
         return {
@@ -29,6 +51,67 @@ class Signature:
             ],
         }
 
+    @staticmethod
+    def from_dict(data: dict) -> 'Signature':
+        """Inverse of to_dict. The data is not validated."""
+        return Signature([(data['name'], Type.from_dict(data['type']))] +
+                         [(arg['name'], Type.from_dict(arg['type'])) for arg in data['args']])
+
+    def to_json(self) -> str:
+        """Returns the same string as json.dumps(self.to_dict()), reusing the cached JSON of each Type."""
+        args = ', '.join(f'{{"name": {encode_basestring_ascii(arg.name)}, "type": {arg.type.to_json()}}}'
+                         for arg in self.args)
+        return f'{{"name": {encode_basestring_ascii(self.name)}, "type": {self.type.to_json()}, "args": [{args}]}}'
+
+
+_signature_args = Signature.args  # The slot, which LazySignature wraps in a property.
+
+
+class LazySignature(Signature):
+    """Signature returned by parse(signature, lazy=True). The function name and return type are validated
+    on construction; argument names and types and the checks across arguments run on first access to
+    args, or when validate() is called, and raise the same exceptions parse would."""
+    __slots__ = ('_pending', '_allow_uppercase')
+
+    def __init__(self, names_and_types: List[Tuple[str, str]], function_type: Type, allow_uppercase: bool):
+        self.name = sys.intern(names_and_types[0][0])
+        self.type = function_type
+        self._pending = names_and_types  # Unvalidated (name, type) strings, function first.
+        self._allow_uppercase = allow_uppercase
+
+    @property
+    def args(self) -> List[Argument]:
+        if self._pending is not None:
+            self.validate()
+        return _signature_args.__get__(self)
+
+    @args.setter
+    def args(self, args: List[Argument]):
+        self._pending = None
+        _signature_args.__set__(self, args)
+
+    def __reduce__(self):
+        if self._pending is None:
+            return super().__reduce__()  # Unpickled as a Signature, which it now behaves the same as.
+        return LazySignature, (self._pending, self.type, self._allow_uppercase)
+
+    def validate(self) -> Signature:
+        if self._pending is not None:
+            names_and_types = _validate(self._pending, self._allow_uppercase)
+            _signature_args.__set__(self, [Argument(sys.intern(i[0]), i[1]) for i in names_and_types[1:]])
+            self._pending = None
+        return self
+
+
+def _unpickle_signature(name: str, function_type: Type, arg_names: Tuple[str, ...], arg_types: Tuple[Type, ...]
+                        ) -> Signature:
+    signature = Signature.__new__(Signature)
+    signature.name = sys.intern(name)
+    signature.type = function_type
+    # tuple.__new__ skips the argument handling of Argument.__new__, which dominates unpickling otherwise.
+    signature.args = list(map(tuple.__new__, itertools.repeat(Argument), zip(map(sys.intern, arg_names), arg_types)))
+    return signature
+
 
 class ValidationException(Exception):
     pass
@@ -42,113 +125,297 @@ class InvalidTypeException(ValidationException):
     pass
 
 
-def parse(signature: str) -> Signature:
-    """Parses a string like 'int32 f(x:int32,y:int32)' into a Signature instance."""
-    pattern = r'(.+) (.+)\((.+)*\)'  # The string must be in format: "type0 fun_name(args*)".
+def parse(signature: str, lazy: bool = False, allow_uppercase: Optional[bool] = None) -> Signature:
+    """Parses a string like 'int32 f(x:int32,y:int32)' into a Signature instance.
+    If lazy, only the function name and return type are validated now and a LazySignature is returned.
+    Names may contain uppercase letters if allow_uppercase, which defaults to ALLOW_UPPERCASE_IN_NAMES.
+    Safe to call from several threads at once."""
+    if allow_uppercase is None:
+        allow_uppercase = ALLOW_UPPERCASE_IN_NAMES
+    if lazy:
+        names_and_types = _tokenize(signature)
+        return LazySignature(names_and_types, _convert_types(names_and_types[:1], allow_uppercase)[0][1],
+                             allow_uppercase)
+    collector = instrumentation.collector  # Read once: another thread may disable instrumentation.
+    if collector is not None:
+        return _parse_instrumented(signature, collector, allow_uppercase)
+    return Signature(_validate(_tokenize(signature), allow_uppercase))
+
+
+def _parse_instrumented(signature: str, collector: instrumentation.ParseStats, allow_uppercase: bool
+                        ) -> Signature:
+    """Same as parse, timing each phase of _tokenize and _validate separately."""
+    phase_seconds = dict.fromkeys(instrumentation.PHASES, 0.0)
+    phase_calls = dict.fromkeys(instrumentation.PHASES, 0)
+    depths = [0]  # Of the types validated so far, also if validation fails later.
+    clock = time.perf_counter
+
+    def timed(phase, function, *args):
+        start = clock()
+        try:
+            result = function(*args)
+        finally:
+            phase_seconds[phase] += clock() - start
+            phase_calls[phase] += 1
+        if phase == 'types' and result[1]:
+            depths.append(result[0].depth)
+        return result
+
+    arg_type_list = []
+    exception = None
+    try:
+        arg_type_list = timed('tokenize', _tokenize, signature)
+        return Signature(_validate(arg_type_list, allow_uppercase, timed=timed))
+    except ValidationException as e:
+        exception = e
+        raise
+    finally:
+        collector.add(instrumentation.ParseRecord(signature, phase_seconds, phase_calls,
+                                                  max(len(arg_type_list) - 1, 0), max(depths), exception))
+
+
+def canonical_form(signature: str) -> str:
+    """Returns the signature without the whitespace parse ignores, e.g. 'int32 f(a:list[int32],b:char)'
+    for 'int32  f( a: list[ int32 ], b:char )'. Signatures with the same canonical form parse to equal
+    results. Raises ValidationException if the signature is malformed."""
+    return _canonical_form(_tokenize(signature))
+
+
+def fingerprint(signature: str) -> str:
+    """Stable hex digest of the canonical form of the signature."""
+    return _fingerprint(_tokenize(signature))
+
+
+def _canonical_form(arg_type_list: List[Tuple[str, str]]) -> str:
+    (function_name, function_type), *args = arg_type_list
+    args = ','.join(f'{name}:{_canonical_type(data_type)}' for name, data_type in args)
+    return f'{_canonical_type(function_type)} {function_name}({args})'
+
+
+def _canonical_type(data_type: str) -> str:
+    """Removes whitespace after '[' and before ']', where validate_type ignores it."""
+    if '[' not in data_type:
+        return data_type
+    data_type = '['.join([part.lstrip() for part in data_type.split('[')])
+    return ']'.join([part.rstrip() for part in data_type.split(']')])
+
+
+def _fingerprint(arg_type_list: List[Tuple[str, str]]) -> str:
+    return hashlib.sha256(_canonical_form(arg_type_list).encode('utf-8')).hexdigest()
+
+
+def parse_many(signatures: Iterable[str], workers: int = 0, chunk_size: int = 1000, cache=None,
+               allow_uppercase: Optional[bool] = None) -> Iterator[Tuple[str, Union[Signature, ValidationException]]]:
+    """Parses every signature of an iterable, yielding (signature, Signature or ValidationException)
+    pairs in input order. The input is consumed lazily, so memory does not grow with its size.
+    If a cache (e.g. cache.DiskParseCache) is given, its parse method is used instead of parse.
+
+    With workers > 1, chunks of chunk_size signatures are parsed in a pool of that many processes;
+    at most two chunks per worker are in flight at any time. Each worker gets a copy of the cache
+    once, when it starts, so the cache must be picklable: a DiskParseCache is, and each copy opens
+    its own connection; a ParseCache is not, as its entries could not be shared with the workers.
+    Invalid arguments raise on the call, before any signature is read."""
+    if chunk_size < 1:
+        raise ValueError('chunk_size must be positive')
+    if allow_uppercase is None:
+        allow_uppercase = ALLOW_UPPERCASE_IN_NAMES
+    if workers <= 1:
+        return ((signature, _parse_or_exception(signature, cache, allow_uppercase)) for signature in signatures)
+
+    import pickle
+    try:
+        pickled_cache = pickle.dumps(cache)
+    except (TypeError, pickle.PicklingError) as e:
+        raise TypeError(f'A cache used by worker processes must be picklable, e.g. a DiskParseCache: {e}') from e
+    return _parse_in_workers(signatures, workers, chunk_size, pickled_cache, allow_uppercase)
+
+
+def _parse_in_workers(signatures: Iterable[str], workers: int, chunk_size: int, pickled_cache: bytes,
+                      allow_uppercase: bool) -> Iterator[Tuple[str, Union[Signature, ValidationException]]]:
+    import multiprocessing  # Not imported with this module, as parse does not need it.
+
+    chunks = _chunks(signatures, chunk_size)
+    # multiprocessing.Pool rather than ProcessPoolExecutor, which has no initializer before Python 3.7.
+    with multiprocessing.Pool(workers, _init_worker, (pickled_cache,)) as pool:
+        pending = deque()
+        for chunk in itertools.islice(chunks, 2 * workers):
+            pending.append((chunk, pool.apply_async(_parse_chunk, (chunk, allow_uppercase))))
+        while pending:
+            chunk, result = pending.popleft()
+            results = result.get()
+            for next_chunk in itertools.islice(chunks, 1):
+                pending.append((next_chunk, pool.apply_async(_parse_chunk, (next_chunk, allow_uppercase))))
+            yield from zip(chunk, results)
+        # Lets the workers exit normally, running the finalizer of _init_worker; leaving the with block
+        # without this, e.g. when the caller stops early, terminates them.
+        pool.close()
+        pool.join()
+
+
+_worker_cache = None  # The cache of parse_many in a worker process.
+
+
+def _init_worker(pickled_cache: bytes):
+    """Runs once in each worker process of parse_many. The cache arrives pickled, so even a forked worker
+    unpickles its own copy rather than sharing e.g. a database connection with the parent."""
+    global _worker_cache
+    import multiprocessing.util
+    import pickle
+    _worker_cache = pickle.loads(pickled_cache)
+    close = getattr(_worker_cache, 'close', None)  # E.g. DiskParseCache's, which closes its connection.
+    if close is not None:
+        multiprocessing.util.Finalize(None, close, exitpriority=0)  # Runs when the worker exits.
+
+
+def _parse_or_exception(signature: str, cache, allow_uppercase: bool) -> Union[Signature, ValidationException]:
+    try:
+        if cache is not None:
+            return cache.parse(signature, allow_uppercase=allow_uppercase)
+        return parse(signature, allow_uppercase=allow_uppercase)
+    except ValidationException as e:
+        return e
+
+
+def _parse_chunk(chunk: List[str], allow_uppercase: bool) -> List[Union[Signature, ValidationException]]:
+    """Runs in a worker process of parse_many, which passes the parent's name rules along."""
+    return [_parse_or_exception(signature, _worker_cache, allow_uppercase) for signature in chunk]
+
+
+def _chunks(iterable: Iterable[str], chunk_size: int) -> Iterator[List[str]]:
+    iterator = iter(iterable)
+    while True:
+        chunk = list(itertools.islice(iterator, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _tokenize(signature: str) -> List[Tuple[str, str]]:
+    """Splits a signature into (name, type) string pairs: the function first, then its arguments.
+    Names and types are stripped but not validated.
+
+    The string must be in format "type0 fun_name(args*)". Accepts exactly the strings the former
+    backtracking regex did, but every step is a linear scan: the last '(' opens the arguments, and the
+    last space at least two characters before it separates the return type from the function name."""
     signature = signature.strip()
-    regex_string = re.fullmatch(pattern, signature)
-
-    if regex_string is None:  # if regex is not matched.
+    open_paren = signature.rfind('(', 0, len(signature) - 1)
+    # The return type and the function name are both non-empty, so the space is in [1, open_paren - 2].
+    split_space = signature.rfind(' ', 1, open_paren - 1) if open_paren > 2 else -1
+    if split_space == -1 or not signature.endswith(')') or '\n' in signature:
         raise ValidationException('Malformed function signature')
 
-    groups = regex_string.groups()
-    return_type = groups[0]
-    function_name = groups[1]
-
-    if (groups[2] is None) or groups[2].strip() == '':  # Function does not have arguments.
-        function_args = []
-    else:
-        function_args = groups[2].split(
-            ':')  # It will be in format ["arg1", "type1, arg2", "type2, arg3", ..., "typeN"]
+    names_and_types = [(signature[split_space + 1:open_paren].strip(), signature[:split_space].strip())]
+    function_args = signature[open_paren + 1:-1]
+    if function_args.strip() == '':  # Function does not have arguments.
+        return names_and_types
 
+    # It will be in format ["arg1", "type1, arg2", "type2, arg3", ..., "typeN"]
+    function_args = function_args.split(':')
     if len(function_args) == 1:
         raise ValidationException('Invalid format of function arguments')
 
-    names_and_types: List[str] = [function_name, return_type]  # Argument names and types will be appended:
-
-    if len(function_args) > 0:
-        names_and_types.append(function_args[0])
-
-    function_args_len = len(function_args)
-
-    for i in range(1, function_args_len - 1):
-        type_arg_list = function_args[i].rsplit(',', 1)
+    arg_name = function_args[0]
+    for type_and_name in function_args[1:-1]:
+        type_arg_list = type_and_name.rsplit(',', 1)
         if len(type_arg_list) < 2:
             raise ValidationException('Invalid format of function arguments')
+        names_and_types.append((arg_name.strip(), type_arg_list[0].strip()))
+        arg_name = type_arg_list[1]
+    names_and_types.append((arg_name.strip(), function_args[-1].strip()))  # Appending typeN at the end.
+    return names_and_types
 
-        names_and_types.extend(type_arg_list)
 
-    if function_args_len > 0:
-        names_and_types.append(function_args[function_args_len - 1])  # Appending typeN at the end of list.
-    # Remove extra spaces from beginning and end of each arg and type.
-    names_and_types = list(map(str.strip, names_and_types))
-    tuples_list: List[Tuple[str, str]] = []  # Function name/type, then 1st argument name/type, 2nd, etc.
-
-    for i in range(0, len(names_and_types), 2):
-        tuples_list.append((names_and_types[i], names_and_types[i + 1]))
-    return Signature(_validate(tuples_list))
+def _raise_invalid_name_exception(invalid_name, index):
+    """index is 0 for the function name and 1 or more for argument names."""
+    raise InvalidNameException(f'Invalid {"function" if index == 0 else "argument"} name: {invalid_name}')
 
 
 def _raise_invalid_type_exception(invalid_type):
     error_message = f'{invalid_type} is an invalid type declaration.'
-    if invalid_type in composite_type_names():
+    if registry.composite(invalid_type):
         error_message = f'{error_message} Did you mean {invalid_type}[int32]?'
     raise InvalidTypeException(error_message)
 
 
-def _validate(arg_type_list: List[Tuple[str, str]]) -> List[Tuple[str, Type]]:
-    """Validates names and types of the function and arguments, converts types from str to Type."""
-    function_name = arg_type_list[0][0]
-    function_type = arg_type_list[0][1]
+def _validate(arg_type_list: List[Tuple[str, str]], allow_uppercase: bool, timed=None, lookup_type=validate_type
+              ) -> List[Tuple[str, Type]]:
+    """Validates names and types of the function and arguments, converts types from str to Type.
+    Every check is a single pass; errors are raised in the order of the checks, and within a check
+    for the first offending name in the signature. If given, timed(phase, function, *args) is
+    called instead of each phase function, with a phase of instrumentation.PHASES. Types are
+    converted by lookup_type, which must return the same as validate_type, e.g. from a memo."""
+    new_arg_type_list = _convert_types(arg_type_list, allow_uppercase, timed, lookup_type)
+    for phase, check in _CHECKS:
+        if timed is None:
+            check(new_arg_type_list)
+        else:
+            timed(phase, check, new_arg_type_list)
+    return new_arg_type_list
+
+
+def _convert_types(arg_type_list: List[Tuple[str, str]], allow_uppercase: bool, timed=None,
+                   lookup_type=validate_type) -> List[Tuple[str, Type]]:
+    """Validates each name and then its type, in order. timed and lookup_type are as in _validate."""
+    validate_name = _validate_name
+    if timed is not None:
+        validate_name = functools.partial(timed, 'names', validate_name)
+        lookup_type = functools.partial(timed, 'types', lookup_type)
 
     new_arg_type_list = []
+    for i, (name, data_type) in enumerate(arg_type_list):
+        if not validate_name(name, allow_uppercase):
+            _raise_invalid_name_exception(name, i)
+
+        result = lookup_type(data_type)
+        if not result[1]:
+            _raise_invalid_type_exception(data_type)
+        new_arg_type_list.append((name, result[0]))
+    return new_arg_type_list
 
-    if not _validate_name(function_name):
-        raise InvalidNameException(f'Invalid function name: {function_name}')
 
-    function_type_validation = validate_type(function_type)
-    if not function_type_validation[1]:
-        _raise_invalid_type_exception(function_type)
-    else:
-        new_arg_type_list.append((function_name, function_type_validation[0]))
+def _check_duplicate_names(new_arg_type_list: List[Tuple[str, Type]]):
+    """Argument names cannot repeat, argument cannot be named as the function."""
+    seen = set()
+    duplicates = set()
+    for name, _ in new_arg_type_list:
+        if name in seen:
+            duplicates.add(name)
+        seen.add(name)
+    for name, _ in new_arg_type_list:
+        if name in duplicates:
+            raise InvalidNameException(f'"{name}" appears more than once among function and argument names')
 
-    for i in arg_type_list[1:]:
-        if not _validate_name(i[0]):
-            raise InvalidNameException(f'Invalid argument name: {i[0]}')
 
-        result = validate_type(i[1])
-        if not result[1]:
-            _raise_invalid_type_exception(i[1])
-        else:
-            new_arg_type_list.append((i[0], result[0]))
-
-    # Argument names cannot repeat, argument cannot be named as the function:
-    for i in range(0, len(new_arg_type_list)):
-        for j in range(i + 1, len(new_arg_type_list)):
-            if new_arg_type_list[i][0] == new_arg_type_list[j][0]:
-                raise InvalidNameException(
-                    f'"{new_arg_type_list[i][0]}" appears more than once among function and argument names')
-
-    # Not allowing declarations of a custom type with more than one different subtypes in one function:
-    for i in range(0, len(new_arg_type_list)):
-        for j in range(i + 1, len(new_arg_type_list)):
-            if new_arg_type_list[i][1].custom:
-                if new_arg_type_list[i][1].name == new_arg_type_list[j][1].name:
-                    if new_arg_type_list[i][1] != new_arg_type_list[j][1]:
-                        raise InvalidTypeException(
-                            f'Two declarations of custom type {new_arg_type_list[i][1].name}')
-
-    # Function or argument cannot be named as one of the types:
-    for i in range(0, len(new_arg_type_list)):
-        for type_name in all_type_names():
-            if new_arg_type_list[i][0] == type_name:
-                raise InvalidNameException(
-                    f'"{type_name}" matches a type name; that is not acceptable for a name')
+def _check_custom_types(new_arg_type_list: List[Tuple[str, Type]]):
+    """Not allowing declarations of a custom type with more than one different subtypes in one function."""
+    first_declarations = {}  # Custom type name -> its first Type, in order of first appearance.
+    conflicts = set()
+    for _, data_type in new_arg_type_list:
+        if data_type.custom:
+            first_declaration = first_declarations.setdefault(data_type.name, data_type)
+            if first_declaration != data_type:
+                conflicts.add(data_type.name)
+    for type_name in first_declarations:
+        if type_name in conflicts:
+            raise InvalidTypeException(f'Two declarations of custom type {type_name}')
 
-    return new_arg_type_list
+
+def _check_type_names(new_arg_type_list: List[Tuple[str, Type]]):
+    """Function or argument cannot be named as one of the types."""
+    for name, _ in new_arg_type_list:
+        if name in registry:
+            raise InvalidNameException(f'"{name}" matches a type name; that is not acceptable for a name')
+
+
+# The checks across the function and its arguments, in order, with their instrumentation phases.
+_CHECKS = (('duplicate_names', _check_duplicate_names), ('custom_types', _check_custom_types),
+           ('type_names', _check_type_names))
+
+_NAME_PATTERN = re.compile(r'^[a-zA-Z][a-zA-Z0-9_]*$')
+_LOWERCASE_NAME_PATTERN = re.compile(r'^[a-z][a-z0-9_]*$')
 
 
-def _validate_name(name: str) -> bool:
+def _validate_name(name: str, allow_uppercase: bool) -> bool:
     """Checks if given string is a valid name for the student's solution function or its argument."""
-    return ALLOW_UPPERCASE_IN_NAMES and bool(re.match(r'^[a-zA-Z][a-zA-Z0-9_]*$', name)) or \
-           not ALLOW_UPPERCASE_IN_NAMES and bool(re.match(r'^[a-z][a-z0-9_]*$', name))
+    pattern = _NAME_PATTERN if allow_uppercase else _LOWERCASE_NAME_PATTERN
+    return pattern.match(name) is not None
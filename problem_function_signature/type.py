@@ -1,59 +1,191 @@
+import hashlib
 import re
-from typing import Tuple, Optional
+import threading
+from json.encoder import encode_basestring_ascii
+from typing import Dict, Iterator, NamedTuple, Tuple, Optional
 
-import itertools
+# Increment when the type syntax or validation rules change in a way the registered types do not reflect.
+_GRAMMAR_REVISION = 1
 
 
-_primitive_type_names = ['int32', 'int64', 'bool', 'char', 'str', 'float']
-_composite_type_names = ['list', 'LinkedListNode', 'BinaryTreeNode', 'TreeNode']
+class TypeInfo(NamedTuple):
+    name: str
+    composite: bool  # Takes an element type: name[element_type].
+    # "Custom" types are different from the others ("built-in") in that we declare every custom type
+    # as a class or struct in code stubs (head.txt) in all languages. They are composite.
+    custom: bool
+
+
+class _Tables(NamedTuple):
+    """Everything derived from the registered types. Replaced as a whole on registration."""
+    types: Dict[str, TypeInfo]  # In registration order.
+    primitive: Dict[str, TypeInfo]
+    composite: Dict[str, TypeInfo]
+    version: str
+
+
+class TypeRegistry:
+    """The type names of the grammar and their properties, looked up by hash.
+
+    Registration copies the tables and replaces them in one assignment, so lookups, which vastly
+    outnumber registrations, read a consistent snapshot without taking a lock. Types cannot be
+    unregistered: interned Type instances of them may exist."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._tables = _tables({})
+
+    def register(self, name: str, composite: bool = False, custom: bool = False) -> TypeInfo:
+        if not _TYPE_NAME_PATTERN.fullmatch(name):
+            raise ValueError(f'Invalid type name: {name!r}')
+        if custom and not composite:
+            raise ValueError('Custom types must be composite')
+        info = TypeInfo(name, composite, custom)
+        with self._lock:
+            if name in self._tables.types:
+                raise ValueError(f'Type {name} is already registered')
+            types = dict(self._tables.types)
+            types[name] = info
+            self._tables = _tables(types)
+        return info
+
+    def get(self, name: str) -> Optional[TypeInfo]:
+        return self._tables.types.get(name)
+
+    def __contains__(self, name) -> bool:
+        return name in self._tables.types
+
+    def __iter__(self) -> Iterator[TypeInfo]:
+        return iter(self._tables.types.values())
+
+    def primitive(self, name: str) -> bool:
+        return name in self._tables.primitive
+
+    def composite(self, name: str) -> bool:
+        return name in self._tables.composite
+
+    def version(self) -> str:
+        return self._tables.version
+
+
+def _tables(types: Dict[str, TypeInfo]) -> _Tables:
+    primitive = {name: info for name, info in types.items() if not info.composite}
+    composite = {name: info for name, info in types.items() if info.composite}
+    custom = [name for name, info in types.items() if info.custom]
+    grammar = repr((_GRAMMAR_REVISION, list(primitive), list(composite), custom))
+    return _Tables(types, primitive, composite, hashlib.sha256(grammar.encode('utf-8')).hexdigest()[:16])
+
+
+_TYPE_NAME_PATTERN = re.compile(r'[a-zA-Z][a-zA-Z0-9_]*')
+
+registry = TypeRegistry()
+for _name in ('int32', 'int64', 'bool', 'char', 'str', 'float'):
+    registry.register(_name)
+registry.register('list', composite=True)
+for _name in ('LinkedListNode', 'BinaryTreeNode', 'TreeNode'):
+    registry.register(_name, composite=True, custom=True)
+del _name
 
 
 def all_type_names():
-    return itertools.chain(_primitive_type_names, _composite_type_names)
+    return iter(registry._tables.types)
+
+
+def grammar_version() -> str:
+    """Identifies the type grammar: changes whenever a type is registered or the grammar revision changes.
+    Persisted parse results are only valid for the grammar version they were produced with."""
+    return registry.version()
 
 
 def primitive_type_names():
-    return itertools.chain(_primitive_type_names)
+    return iter(registry._tables.primitive)
 
 
 def composite_type_names():
-    return itertools.chain(_composite_type_names)
+    return iter(registry._tables.composite)
 
 
 class Type:
-    """Type of function argument or return value. Intended to be immutable (not enforced)."""
-
-    def __init__(self, name: str, element_type=None):
-        self.name = name
-        self.element_type = element_type  # Type of the element of a composite type, e.g. a collection.
-        self.primitive = element_type is None
-        self.custom = name in ('LinkedListNode', 'BinaryTreeNode', 'TreeNode')
-        # "Custom" types are different from the others ("built-in") in that we declare every custom type
-        # as a class or struct in code stubs (head.txt) in all languages.
-
-        if self.primitive:
-            assert name in _primitive_type_names
-            assert element_type is None
-            assert not self.custom
+    """Type of function argument or return value. Immutable.
+
+    Instances are interned: constructing a type that is structurally equal to an existing one returns
+    the existing instance, so equality is an identity check and the hash is computed once.
+    Structural properties are computed once from the element type's, so every query is O(1):
+    depth (0 for primitives), leaf_type (the innermost primitive Type) and custom_type_names
+    (frozenset of the names of all custom types in self, e.g. {'LinkedListNode'} for
+    list[LinkedListNode[int32]])."""
+
+    __slots__ = ('name', 'element_type', 'primitive', 'custom', 'depth', 'leaf_type', 'custom_type_names',
+                 '_list_of_primitive', '_list_of_lists', '_hash', '_str', '_json')
+
+    _interned = {}  # (name, element_type) -> Type. Reads and setdefault() need no lock.
+
+    def __new__(cls, name: str, element_type=None):
+        key = (name, element_type)
+        interned = cls._interned.get(key)
+        if interned is not None:
+            return interned
+
+        self = super().__new__(cls)
+        primitive = element_type is None
+        info = registry.get(name)
+        assert info is not None and info.composite != primitive
+        assert primitive or isinstance(element_type, Type)
+        custom = info.custom
+
+        object.__setattr__(self, 'name', name)
+        object.__setattr__(self, 'element_type', element_type)  # Type of the element of a composite type.
+        object.__setattr__(self, 'primitive', primitive)
+        object.__setattr__(self, 'custom', custom)
+        if primitive:
+            object.__setattr__(self, 'depth', 0)
+            object.__setattr__(self, 'leaf_type', self)
+            object.__setattr__(self, 'custom_type_names', frozenset())
+            object.__setattr__(self, '_list_of_primitive', (False, None))
+            object.__setattr__(self, '_list_of_lists', False)
         else:
-            assert name in _composite_type_names
-            assert element_type is not None
+            object.__setattr__(self, 'depth', element_type.depth + 1)
+            object.__setattr__(self, 'leaf_type', element_type.leaf_type)
+            custom_type_names = element_type.custom_type_names
+            if custom and name not in custom_type_names:
+                custom_type_names = custom_type_names | {name}
+            object.__setattr__(self, 'custom_type_names', custom_type_names)
+            object.__setattr__(self, '_list_of_primitive', (name == 'list', element_type) if element_type.primitive
+                               else element_type._list_of_primitive)
+            # LinkedListNode[list[...]] and list[LinkedListNode[...]]: until CSG properly supports types like
+            # these, we need this behaviour to get some "problem review" tests to work as we need them to.
+            object.__setattr__(self, '_list_of_lists', (name, element_type.name) in (
+                ('list', 'list'), ('list', 'LinkedListNode'), ('LinkedListNode', 'list')))
+        object.__setattr__(self, '_hash', hash(key))  # element_type's hash is already cached.
+        object.__setattr__(self, '_str', None)
+        object.__setattr__(self, '_json', None)
+        return cls._interned.setdefault(key, self)  # Another thread may have interned it first.
+
+    def __setattr__(self, name, value):
+        raise AttributeError('Type instances are interned and cannot be modified')
+
+    def __reduce__(self):
+        # Pickled as its code, which is shorter than the graph of Types and unpickled without recursion.
+        # Pickle's memo sends each Type once per pickle.
+        return _unpickle_type, (_type_code(self),)
 
     def __eq__(self, other):
-        if not hasattr(other, 'name') or self.name != other.name:
-            return False
-        if not hasattr(other, 'element_type') or self.element_type != other.element_type:
-            return False
-        return True
+        return self is other
 
     def __hash__(self):
-        return hash((self.name, self.element_type))
+        return self._hash
 
     def __str__(self):
-        if self.primitive:
-            return self.name
-        else:
-            return f'{self.name}_{self.element_type}'
+        if self._str is None:
+            # Built iteratively and cached on first use: deeply nested types would exceed the
+            # recursion limit, and caching every level eagerly would be quadratic in memory.
+            names = []
+            data_type = self
+            while data_type is not None:
+                names.append(data_type.name)
+                data_type = data_type.element_type
+            object.__setattr__(self, '_str', '_'.join(names))
+        return self._str
 
     def __repr__(self):
         return self.__str__()
@@ -61,49 +193,128 @@ class Type:
     def contains_list_of_primitive(self):
         """Returns whether self is a list of primitive values OR contains one.
            If it is or does, second returned value is the (primitive) type of the list elements."""
-        if self.primitive:
-            return False, None
-        elif self.element_type.primitive:
-            return self.name == 'list', self.element_type
-        else:
-            return self.element_type.contains_list_of_primitive()
+        return self._list_of_primitive
 
     def is_list_of_lists(self):
-        if self.primitive:
-            return False
-        if str(self).startswith('list_LinkedListNode') or str(self).startswith('LinkedListNode_list'):
-            # Until CSG properly supports types like
-            # these, we need this
-            # behaviour to get some "problem review" tests
-            # to work as we need them to.
-            return True
-        return self.name == 'list' and self.element_type.name == 'list'
+        return self._list_of_lists
 
     def to_dict(self):
-        return {
-            'name': self.name,
-            'element_type': self.element_type.to_dict() if self.element_type else None,
-            'primitive': self.primitive,
-            'custom': self.custom,
-        }
+        """Built from the innermost type outward, so nesting depth is not limited by recursion."""
+        levels = []
+        data_type = self
+        while data_type is not None:
+            levels.append(data_type)
+            data_type = data_type.element_type
+        result = None
+        for data_type in reversed(levels):
+            result = {
+                'name': data_type.name,
+                'element_type': result,
+                'primitive': data_type.primitive,
+                'custom': data_type.custom,
+            }
+        return result
+
+    @staticmethod
+    def from_dict(data: dict) -> 'Type':
+        """Inverse of to_dict."""
+        names = []
+        while data is not None:
+            names.append(data['name'])
+            data = data['element_type']
+        result = None
+        for name in reversed(names):
+            result = Type(name, result)
+        return result
+
+    def to_json(self) -> str:
+        """Returns the same string as json.dumps(self.to_dict()). It is built once and cached; only self
+        caches it, not every nesting level, which would be quadratic in memory for deep types."""
+        if self._json is None:
+            prefixes = []
+            suffixes = []
+            data_type = self
+            while data_type._json is None and not data_type.primitive:
+                prefixes.append(f'{{"name": {encode_basestring_ascii(data_type.name)}, "element_type": ')
+                suffixes.append(f', "primitive": false, "custom": {"true" if data_type.custom else "false"}}}')
+                data_type = data_type.element_type
+            innermost = data_type._json
+            if innermost is None:
+                innermost = f'{{"name": {encode_basestring_ascii(data_type.name)}, "element_type": null, ' \
+                            f'"primitive": true, "custom": false}}'
+                object.__setattr__(data_type, '_json', innermost)
+            suffixes.reverse()
+            object.__setattr__(self, '_json', ''.join(prefixes) + innermost + ''.join(suffixes))
+        return self._json
+
+
+_types_by_code = {}  # Code of _type_code -> Type.
+
+
+def _type_code(data_type: Type) -> str:
+    """The type names, outermost first, separated by spaces; _unpickle_type is the inverse."""
+    names = []
+    while data_type is not None:
+        names.append(data_type.name)
+        data_type = data_type.element_type
+    return ' '.join(names)
+
+
+def _unpickle_type(code: str) -> Type:
+    data_type = _types_by_code.get(code)
+    if data_type is None:
+        for name in reversed(code.split(' ')):
+            data_type = Type(name, data_type)
+        _types_by_code[code] = data_type
+    return data_type
 
 
 def validate_type(data_type: str) -> Tuple[Optional[Type], bool]:
     """Checks if given string is a valid type and returns the Type instance.
-    Recursively validates/creates subtypes for composite types.
+    Composite types are read left to right: each type name is the run of characters up to the next
+    '[', ']' or whitespace and is looked up in the registry; the stack of composite names is collected
+    up to the innermost primitive, then matched against the closing brackets, so the time is linear in
+    the length and nesting depth is not limited by recursion.
     If validation failed, returns False as the second value."""
-    if data_type in primitive_type_names():
+    tables = registry._tables
+    if data_type in tables.primitive:
         return Type(data_type), True
+    if '\n' in data_type or not data_type.endswith(']'):
+        return None, False
+
+    end = len(data_type)
+    position = 0
+    composite_types = []  # Outermost first.
+    open_bracket = data_type.find('[')
+    while open_bracket != -1 and data_type[position:open_bracket] in tables.composite:
+        composite_types.append(data_type[position:open_bracket])
+        position = _skip_spaces(data_type, open_bracket + 1, end)
+        open_bracket = data_type.find('[', position)
+
+    name = _TYPE_NAME_RUN.match(data_type, position).group()
+    if name not in tables.primitive:
+        return None, False
+    position += len(name)
+
+    # Whitespace may surround every subtype, but the outermost ']' must end the string.
+    for _ in composite_types:
+        position = _skip_spaces(data_type, position, end)
+        if position == end or data_type[position] != ']':
+            return None, False
+        position += 1
+    if position != end:
+        return None, False
+
+    result = Type(name)
+    for composite_type in reversed(composite_types):
+        result = Type(composite_type, result)
+    return result, True
+
+
+_TYPE_NAME_RUN = re.compile(r'[^\s\[\]]*')
+
 
-    for composite_type in composite_type_names():
-        pattern = rf'(^{composite_type})\[(.+)\]'
-        regex_string = re.fullmatch(pattern, data_type)
-        if regex_string is not None:
-            sub_type = regex_string.groups()[1].strip()
-            result = validate_type(sub_type)
-            if result[1]:
-                return Type(composite_type, result[0]), True
-            else:
-                return None, False
-
-    return None, False
+def _skip_spaces(data_type: str, position: int, end: int) -> int:
+    while position < end and data_type[position].isspace():
+        position += 1
+    return position
@@ -11,4 +11,7 @@ setup(
     url="https://github.com/InterviewKickstart/ProblemFunctionSignature",
     packages=['ik.problem.function'],
     package_dir={'ik.problem.function': 'problem_function_signature'},
+    entry_points={
+        'console_scripts': ['ik-problem-function=ik.problem.function.cli:main'],
+    },
 )
@@ -0,0 +1,51 @@
+import random
+
+from problem_function_signature import batch
+from problem_function_signature import signature as function
+
+TYPES = ['int32', 'list[ int32 ]', 'list[list[char  ]]', 'LinkedListNode[int32]', 'LinkedListNode[ char]', 'int3',
+         'list[int3 ]', 'list', 'TreeNode[str]']
+NAMES = ['a', 'b', 'A', 'f', 'int32', '1x']
+
+
+def _outcome(parse, signature):
+    try:
+        return parse(signature).to_dict()
+    except function.ValidationException as e:
+        return type(e), str(e)
+
+
+def test_results_match_parse():
+    rnd = random.Random(0)
+    signatures = []
+    for _ in range(2000):
+        args = ', '.join(f'{rnd.choice(NAMES)}: {rnd.choice(TYPES)}' for _ in range(rnd.randrange(4)))
+        signatures.append(f'{rnd.choice(TYPES)} {rnd.choice(NAMES)}({args})')
+    signatures += ['int32 f(a)', 'f(a: int32)']
+    for allow_uppercase in [False, True]:
+        result = batch.validate_batch(iter(signatures), allow_uppercase=allow_uppercase)
+        for signature, outcome in zip(signatures, result.results):
+            expected = _outcome(lambda s: function.parse(s, allow_uppercase=allow_uppercase), signature)
+            if isinstance(outcome, function.ValidationException):
+                outcome = type(outcome), str(outcome)
+            else:
+                outcome = outcome.to_dict()
+            assert outcome == expected, signature
+        assert result.stats.signatures == len(signatures) and result.stats.malformed == 2
+        assert result.stats.distinct_types <= len(TYPES)
+
+
+def test_groups():
+    signatures = ['int32 f(a: list[list[char  ]])', 'int32 f(a:list[ list[char]])', 'int32 g(b: list[list[char]])',
+                  'int32 f(a: list[list[char]] )', 'int32 f(a: list[int3])', 'int32 f(a:  list[ int3 ])', 'int32 f(a)']
+    result = batch.validate_batch(signatures)
+    assert result.forms == {'int32 f(a:list[list[char]])': [0, 1, 3], 'int32 g(b:list[list[char]])': [2],
+                            'int32 f(a:list[int3])': [4, 5]}
+    assert result.shapes == {'int32(list[list[char]])': [0, 1, 2, 3], 'int32(list[int3])': [4, 5]}
+    assert result.stats == batch.BatchStats(signatures=7, malformed=1, invalid=2, distinct_forms=3,
+                                            distinct_shapes=2, distinct_types=3)
+    assert result.results[0].to_dict() == result.results[1].to_dict() == function.parse(signatures[1]).to_dict()
+    result.results[0].args.clear()
+    assert result.results[3].to_dict() == function.parse(signatures[3]).to_dict()
+    assert [str(e) for e in result.results[4:6]] == ['list[int3] is an invalid type declaration.',
+                                                     'list[ int3 ] is an invalid type declaration.']
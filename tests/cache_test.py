@@ -0,0 +1,162 @@
+import pytest
+
+from problem_function_signature import cache
+from problem_function_signature import signature as function
+from problem_function_signature import type as t
+
+
+def test_hits_share_normalized_key():
+    parse_cache = cache.ParseCache()
+    first = parse_cache.parse('list[int32] f(a:int32, b:list[char])')
+    second = parse_cache.parse('  list[int32]   f( a : int32 ,b:  list[char] )')
+    assert first.to_dict() == second.to_dict() == function.parse('list[int32] f(a:int32, b:list[char])').to_dict()
+    assert first is not second
+    assert parse_cache.stats() == cache.CacheStats(hits=1, misses=1, evictions=0, size=1, maxsize=4096)
+
+
+def test_mutating_result_does_not_corrupt_cache():
+    parse_cache = cache.ParseCache()
+    parse_cache.parse('int32 f(a:int32)').args.append(function.Argument('b', t.Type('char')))
+    assert parse_cache.parse('int32 f(a:int32)').args == [function.Argument('a', t.Type('int32'))]
+
+
+def test_negative_results_are_cached():
+    parse_cache = cache.ParseCache()
+    with pytest.raises(function.InvalidTypeException) as first:
+        parse_cache.parse('int32 f(a:list)')
+    with pytest.raises(function.InvalidTypeException) as second:
+        parse_cache.parse('int32 f(a: list)')
+    assert first.value is not second.value and type(first.value) is type(second.value)
+    assert str(first.value) == str(second.value) == 'list is an invalid type declaration. Did you mean list[int32]?'
+    assert parse_cache.stats().hits == 1
+
+    try:
+        raise KeyError('unrelated')
+    except KeyError:
+        with pytest.raises(function.InvalidTypeException):
+            parse_cache.parse('int32 f(a:list)')
+    with pytest.raises(function.InvalidTypeException) as third:
+        parse_cache.parse('int32 f(a:list)')
+    assert third.value.__context__ is None
+
+    with pytest.raises(function.ValidationException, match='Malformed'):
+        parse_cache.parse('int32 f(a:int32')
+    assert parse_cache.stats().size == 1
+
+
+def test_lru_eviction():
+    parse_cache = cache.ParseCache(maxsize=2)
+    parse_cache.parse('int32 f()')
+    parse_cache.parse('int32 g()')
+    parse_cache.parse('int32 f()')  # g is now the least recently used.
+    parse_cache.parse('int32 h()')
+    parse_cache.parse('int32 f()')
+    assert parse_cache.stats() == cache.CacheStats(hits=2, misses=3, evictions=1, size=2, maxsize=2)
+    parse_cache.parse('int32 g()')
+    assert parse_cache.stats().misses == 4
+
+
+def test_name_rules_are_part_of_key():
+    parse_cache = cache.ParseCache()
+    parse_cache.parse('int32 F()', allow_uppercase=True)
+    with pytest.raises(function.InvalidNameException):
+        parse_cache.parse('int32 F()', allow_uppercase=False)
+
+
+def test_fingerprint_ignores_whitespace():
+    assert function.canonical_form('int32  f( a: list[ list[char  ]] , b:int32 )') == \
+        'int32 f(a:list[list[char]],b:int32)'
+    assert function.fingerprint('int32 f(a:list[ char ])') == function.fingerprint('int32  f(a : list[char])')
+    assert function.fingerprint('int32 f(a:list [char])') != function.fingerprint('int32 f(a:list[char])')
+    assert function.fingerprint('int32 f(a:int32)') != function.fingerprint('int32 f(b:int32)')
+
+
+def test_disk_cache_survives_reopening(tmp_path):
+    path = str(tmp_path / 'cache.sqlite')
+    disk_cache = cache.DiskParseCache(path)
+    assert disk_cache.parse('list[int32] f(a:TreeNode[char])').to_dict() == \
+        function.parse('list[int32] f(a:TreeNode[char])').to_dict()
+    with pytest.raises(function.InvalidNameException, match='Invalid argument name: 1a'):
+        disk_cache.parse('int32 f(1a:int32)')
+    disk_cache.close()
+
+    disk_cache = cache.DiskParseCache(path)
+    assert disk_cache.parse('list[int32]  f(a: TreeNode[ char ])').to_dict() == \
+        function.parse('list[int32] f(a:TreeNode[char])').to_dict()
+    with pytest.raises(function.InvalidNameException, match='Invalid argument name: 1a'):
+        disk_cache.parse('int32 f(1a :int32)')
+    assert disk_cache.stats() == cache.CacheStats(hits=2, misses=0, evictions=0, size=2, maxsize=0)
+    disk_cache.close()
+
+
+def test_disk_cache_hit_on_deeply_nested_type(tmp_path):
+    path = str(tmp_path / 'cache.sqlite')
+    signature = 'list[' * 2000 + 'int32' + ']' * 2000 + ' f(a: TreeNode[' + 'list[' * 2000 + 'char' + ']' * 2001 + ')'
+    expected = function.parse(signature).to_json()
+    for hits in range(2):
+        disk_cache = cache.DiskParseCache(path)
+        assert disk_cache.parse(signature).to_json() == expected
+        assert disk_cache.stats().hits == hits
+        disk_cache.close()
+
+
+def test_disk_cache_is_invalidated_by_grammar_change(tmp_path, monkeypatch):
+    path = str(tmp_path / 'cache.sqlite')
+    cache.DiskParseCache(path).parse('int32 f()')
+    registry = t.TypeRegistry()
+    for info in t.registry:
+        registry.register(*info)
+    registry.register('GraphNode', composite=True, custom=True)
+    monkeypatch.setattr(t, 'registry', registry)
+    assert cache.DiskParseCache(path).stats().size == 0
+
+
+def test_disk_cache_in_workers(tmp_path):
+    disk_cache = cache.DiskParseCache(str(tmp_path / 'cache.sqlite'))
+    signatures = ['int32 f(a:int32)', 'int32 f(a)', 'char g(x:list[char])'] * 3
+    results = list(function.parse_many(signatures, workers=2, chunk_size=2, cache=disk_cache))
+    assert [result for _, result in results][2].to_dict() == function.parse('char g(x:list[char])').to_dict()
+    assert disk_cache.stats().size == 2
+
+
+def test_disk_cache_errors_quote_each_spelling(tmp_path):
+    disk_cache = cache.DiskParseCache(str(tmp_path / 'cache.sqlite'))
+    for signature in ['int32 f(b: list[ TreeNode[int3  ]])', 'int32 f(b: list[ TreeNode[int3]])']:
+        with pytest.raises(function.InvalidTypeException) as e:
+            disk_cache.parse(signature)
+        with pytest.raises(function.InvalidTypeException) as expected:
+            function.parse(signature)
+        assert str(e.value) == str(expected.value)
+    assert disk_cache.stats().misses == 2
+
+
+def test_disk_cache_drops_other_formats(tmp_path):
+    path = str(tmp_path / 'cache.sqlite')
+    disk_cache = cache.DiskParseCache(path)
+    disk_cache.parse('int32 f()')
+    with disk_cache._connection:
+        disk_cache._connection.execute("UPDATE meta SET value = '1' WHERE key = 'format'")
+    disk_cache.close()
+    assert cache.DiskParseCache(path).stats().size == 0
+
+
+class _ClosingCache(cache.DiskParseCache):
+    """Records in a file when a copy in a worker process is closed."""
+
+    def close(self):
+        super().close()
+        with open(self._path + '.closed', 'a') as f:
+            f.write('closed\n')
+
+
+def test_workers_close_their_cache(tmp_path):
+    path = str(tmp_path / 'cache.sqlite')
+    results = function.parse_many(['int32 f(a:int32)'] * 8, workers=2, chunk_size=1, cache=_ClosingCache(path))
+    assert len(list(results)) == 8
+    with open(path + '.closed') as f:
+        assert f.read() == 'closed\n' * 2
+
+
+def test_workers_need_picklable_cache():
+    with pytest.raises(TypeError, match='picklable'):
+        list(function.parse_many(['int32 f()'], workers=2, cache=cache.ParseCache()))
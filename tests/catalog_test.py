@@ -0,0 +1,73 @@
+from concurrent.futures import ProcessPoolExecutor
+
+import pytest
+
+from problem_function_signature import catalog as cat
+from problem_function_signature import signature as function
+
+SIGNATURES = [
+    'int32 f(a:int32, b:list[int32])',
+    'list[LinkedListNode[int32]] merge(lists: list[LinkedListNode[int32]])',
+    'bool f()',
+    'BinaryTreeNode[char] build(prefix: str)',
+    'list[' * 2000 + 'int32' + ']' * 2000 + ' deep(x: list[int32])',
+    'TreeNode[float] clone(root: TreeNode[float], depth: int64)',
+]
+
+
+def _json(signatures):
+    """to_json rather than to_dict: comparing dicts recurses, and parsed has a deeply nested type."""
+    return [signature.to_json() for signature in signatures]
+
+
+@pytest.fixture
+def parsed():
+    return [function.parse(signature) for signature in SIGNATURES]
+
+
+def test_round_trip(tmp_path, parsed):
+    path = str(tmp_path / 'signatures.cat')
+    cat.write_catalog(path, parsed)
+    with cat.Catalog.open(path) as catalog:
+        assert len(catalog) == len(parsed)
+        assert catalog[1].to_json() == parsed[1].to_json()
+        assert catalog[-1].to_json() == parsed[-1].to_json()
+        assert _json(catalog) == _json(parsed)
+        assert catalog[4].type is parsed[4].type
+        with pytest.raises(IndexError):
+            catalog[len(parsed)]
+
+
+def test_find_by_name(parsed):
+    catalog = cat.Catalog(cat.catalog_bytes(parsed))
+    assert _json(catalog.find('f')) == _json([parsed[0], parsed[2]])
+    assert _json(catalog.find('merge')) == _json([parsed[1]])
+    assert catalog.find('missing') == []
+    assert cat.Catalog(cat.catalog_bytes([])).find('f') == []
+
+
+def test_invalid_catalog():
+    with pytest.raises(ValueError, match='Not a signature catalog'):
+        cat.Catalog(b'\0' * 64)
+
+
+def _find_in_shared(name: str, function_name: str):
+    catalog = cat.Catalog.attach(name)
+    try:
+        return len(catalog), _json(catalog.find(function_name))
+    finally:
+        catalog.close()
+
+
+@pytest.mark.skipif(cat.shared_memory is None, reason='requires Python 3.8+')
+def test_shared_catalog(parsed):
+    block = cat.share_catalog(parsed)
+    try:
+        with ProcessPoolExecutor(2) as executor:
+            results = list(executor.map(_find_in_shared, [block.name] * 2, ['f', 'build']))
+        assert results == [(len(parsed), _json([parsed[0], parsed[2]])), (len(parsed), _json([parsed[3]]))]
+        with cat.Catalog.attach(block.name) as catalog:
+            assert _json(catalog) == _json(parsed)
+    finally:
+        block.close()
+        block.unlink()
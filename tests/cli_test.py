@@ -0,0 +1,43 @@
+import json
+
+import pytest
+
+from problem_function_signature import cli
+from problem_function_signature import signature as function
+
+
+@pytest.mark.parametrize('workers', [0, 2])
+def test_convert_file(tmp_path, capsys, workers):
+    signatures = ['int32 f(x:int32)', 'int32 f(x)', 'list[char] g(a: LinkedListNode[str])']
+    input_path = tmp_path / 'signatures.txt'
+    input_path.write_text('\n'.join(signatures[:2]) + '\n\n' + signatures[2] + '\n')
+    output_path = tmp_path / 'signatures.jsonl'
+
+    assert cli.main([str(input_path), '-o', str(output_path), '-w', str(workers), '--chunk-size', '1']) == 0
+
+    lines = [json.loads(line) for line in output_path.read_text().splitlines()]
+    assert lines == [
+        {'signature': signatures[0], 'result': function.parse(signatures[0]).to_dict()},
+        {'signature': signatures[1],
+         'error': {'type': 'ValidationException', 'message': 'Invalid format of function arguments'}},
+        {'signature': signatures[2], 'result': function.parse(signatures[2]).to_dict()},
+    ]
+    assert '3 signatures (2 valid, 1 invalid)' in capsys.readouterr().err
+
+
+def test_shared_cache(tmp_path, capsys):
+    input_path = tmp_path / 'signatures.txt'
+    input_path.write_text('int32 f(x:int32)\nint32 f(x:int)\n')
+    outputs = []
+    for run in range(2):
+        output_path = tmp_path / f'run{run}.jsonl'
+        assert cli.main([str(input_path), '-o', str(output_path), '--cache', str(tmp_path / 'cache.sqlite')]) == 0
+        outputs.append(output_path.read_text())
+    assert outputs[0] == outputs[1]
+
+
+@pytest.mark.parametrize('option', ['--chunk-size', '--max-pending'])
+def test_rejects_non_positive_sizes(capsys, option):
+    with pytest.raises(SystemExit) as e:
+        cli.main(['-w', '2', option, '0'])
+    assert e.value.code == 2 and 'must be at least 1' in capsys.readouterr().err
@@ -0,0 +1,70 @@
+import random
+
+import pytest
+
+from problem_function_signature import diagnostics
+from problem_function_signature import signature as function
+
+NAMES = ['a', 'b', 'f', 'int32', '1x', 'node', '']
+TYPES = ['int32', 'list[int32]', 'LinkedListNode[int32]', 'LinkedListNode[char]', 'TreeNode[str]', 'list', 'int3']
+SEPARATORS = [', ', ' ', ',']
+
+
+def test_valid_signature():
+    assert diagnostics.diagnose('list[int32] f(a: int32, b: TreeNode[char])') == []
+
+
+def test_first_diagnostic_is_what_parse_raises():
+    rnd = random.Random(0)
+    for _ in range(3000):
+        args = [(rnd.choice(NAMES), rnd.choice(TYPES)) for _ in range(rnd.randrange(5))]
+        text = ''.join(f'{rnd.choice(SEPARATORS) if i else ""}{name}: {data_type}'
+                       for i, (name, data_type) in enumerate(args))
+        signature = f'{rnd.choice(TYPES)} {rnd.choice(NAMES[:-1])}({text})'
+        found = diagnostics.diagnose(signature)
+        try:
+            function.parse(signature)
+        except function.ValidationException as e:
+            assert (found[0].exception, found[0].message) == (type(e), str(e)), signature
+        else:
+            assert found == [], signature
+
+
+def test_collects_all_errors_with_offsets():
+    signature = ' int3 f(1x: int32, a: foo, a: LinkedListNode[int32], b: LinkedListNode[char], list: bool)'
+    found = [(d.offset, d.exception, d.message) for d in diagnostics.diagnose(signature)]
+    assert found == [
+        (signature.index('int3'), function.InvalidTypeException, 'int3 is an invalid type declaration.'),
+        (signature.index('1x'), function.InvalidNameException, 'Invalid argument name: 1x'),
+        (signature.index('foo'), function.InvalidTypeException, 'foo is an invalid type declaration.'),
+        (signature.index('a: L'), function.InvalidNameException,
+         '"a" appears more than once among function and argument names'),
+        (signature.index('LinkedListNode[char]'), function.InvalidTypeException,
+         'Two declarations of custom type LinkedListNode'),
+        (signature.index('list'), function.InvalidNameException,
+         '"list" matches a type name; that is not acceptable for a name'),
+    ]
+
+
+def test_missing_comma_is_reported_and_recovered():
+    found = diagnostics.diagnose('int32 f(a: int32 b: 1x, c: char d: int32)')
+    assert [(d.offset, d.message) for d in found] == [
+        (11, 'Invalid format of function arguments'),
+        (27, 'Invalid format of function arguments'),
+        (20, '1x is an invalid type declaration.'),
+    ]
+
+
+@pytest.mark.parametrize('signature, offset', [
+    ('int32 f(a: int32', 16),
+    ('  int32 f(a:\n int32)', 12),
+    ('f(a: int32)', 0),
+], ids=['missing_paren', 'newline', 'missing_return_type'])
+def test_malformed_signature(signature, offset):
+    assert diagnostics.diagnose(signature) == [
+        diagnostics.Diagnostic(offset, function.ValidationException, 'Malformed function signature')]
+
+
+def test_arguments_without_colon():
+    assert diagnostics.diagnose('int32 f( a)') == [
+        diagnostics.Diagnostic(9, function.ValidationException, 'Invalid format of function arguments')]
@@ -0,0 +1,69 @@
+import pytest
+
+from problem_function_signature import dispatch
+from problem_function_signature.type import validate_type
+
+
+def _type(data_type):
+    return validate_type(data_type)[0]
+
+
+@pytest.fixture
+def dispatcher():
+    dispatcher = dispatch.TypeDispatcher(default='other')
+    dispatcher.register('list[list[*]]', 'matrix')
+    dispatcher.register('LinkedListNode[primitive]', 'list node')
+    dispatcher.register('list[ int64 ]', 'longs')
+    dispatcher.register('list[primitive]', 'array')
+    dispatcher.register('custom[list[*]]', 'custom of lists')
+    dispatcher.register('custom[*]', 'custom')
+    dispatcher.register('int32', 'int')
+    dispatcher.register('list[list[int32]]', 'never: list[list[*]] comes first')
+    return dispatcher
+
+
+@pytest.mark.parametrize('data_type, handler', [
+    ('list[list[int32]]', 'matrix'),
+    ('list[list[list[TreeNode[str]]]]', 'matrix'),
+    ('LinkedListNode[char]', 'list node'),
+    ('LinkedListNode[list[char]]', 'custom of lists'),
+    ('list[int64]', 'longs'),
+    ('list[bool]', 'array'),
+    ('TreeNode[list[int32]]', 'custom of lists'),
+    ('BinaryTreeNode[TreeNode[int32]]', 'custom'),
+    ('int32', 'int'),
+    ('int64', 'other'),
+    ('list[TreeNode[int32]]', 'other'),
+])
+def test_first_matching_pattern_wins(dispatcher, data_type, handler):
+    assert dispatcher.resolve(_type(data_type)) == handler
+    assert dispatcher.resolve(_type(data_type)) == handler  # Memoized.
+
+
+def test_call_and_decorator():
+    dispatcher = dispatch.TypeDispatcher()
+
+    @dispatcher.register('list[*]')
+    def declare_list(data_type, language):
+        return f'{language} list of {data_type.element_type}'
+
+    assert dispatcher(_type('list[char]'), 'java') == 'java list of char'
+    with pytest.raises(LookupError):
+        dispatcher(_type('char'), 'java')
+
+
+def test_register_clears_memo(dispatcher):
+    assert dispatcher.resolve(_type('int64')) == 'other'
+    dispatcher.register('primitive', 'scalar')
+    assert dispatcher.resolve(_type('int64')) == 'scalar'
+    assert dispatcher.resolve(_type('int32')) == 'int'
+
+
+def test_deep_type(dispatcher):
+    assert dispatcher.resolve(_type('TreeNode[' * 5000 + 'char' + ']' * 5000)) == 'custom'
+
+
+@pytest.mark.parametrize('pattern', ['list', 'list[]', 'tree[*]', 'list[int3]', '*[int32]', 'list[*', 'primitive[*]'])
+def test_invalid_pattern(pattern):
+    with pytest.raises(ValueError):
+        dispatch.TypeDispatcher().register(pattern, 'handler')
@@ -0,0 +1,49 @@
+import random
+
+import pytest
+
+from problem_function_signature import incremental
+from problem_function_signature import signature as function
+
+NAMES = ['a', 'b', 'f', 'int32', '1x', 'node']
+TYPES = ['int32', 'list[int32]', 'LinkedListNode[int32]', 'LinkedListNode[char]', 'TreeNode[str]', 'list', 'int3']
+
+
+def _outcome(parse, signature):
+    try:
+        return parse(signature).to_dict()
+    except function.ValidationException as e:
+        return type(e), str(e)
+
+
+def test_edits_match_parse():
+    rnd = random.Random(0)
+    parser = incremental.IncrementalParser()
+    args = [('a', 'int32')]
+    for _ in range(3000):
+        position = rnd.randrange(len(args) + 1)
+        edit = rnd.random()
+        if edit < 0.3 and len(args) > 1:
+            del args[min(position, len(args) - 1)]
+        elif edit < 0.6:
+            args.insert(position, (rnd.choice(NAMES), rnd.choice(TYPES)))
+        else:
+            args[min(position, len(args) - 1)] = (rnd.choice(NAMES), rnd.choice(TYPES))
+        signature = f'{args[0][1]} {args[0][0]}({", ".join(f"{name}: {data_type}" for name, data_type in args[1:])})'
+        assert _outcome(parser.parse, signature) == _outcome(function.parse, signature), signature
+
+
+def test_malformed_edit_keeps_state():
+    parser = incremental.IncrementalParser()
+    parser.parse('int32 f(a:int32, b:char)')
+    with pytest.raises(function.ValidationException, match='Malformed'):
+        parser.parse('int32 f(a:int32, b:char')
+    assert parser.parse('int32 f(a:int32, b:char, c:str)').to_dict() == \
+        function.parse('int32 f(a:int32, b:char, c:str)').to_dict()
+
+
+def test_name_rules_change():
+    parser = incremental.IncrementalParser()
+    parser.parse('int32 f(A:int32)', allow_uppercase=True)
+    with pytest.raises(function.InvalidNameException):
+        parser.parse('int32 f(A:int32)', allow_uppercase=False)
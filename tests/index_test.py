@@ -0,0 +1,82 @@
+import random
+
+import pytest
+
+from problem_function_signature import index
+from problem_function_signature import signature as function
+from problem_function_signature.type import Type, validate_type
+
+TYPES = ['int32', 'char', 'list[int32]', 'list[list[int32]]', 'BinaryTreeNode[char]', 'list[LinkedListNode[int32]]',
+         'TreeNode[list[str]]', 'LinkedListNode[int32]']
+
+
+def _random_signatures(count):
+    rnd = random.Random(0)
+    for i in range(count):
+        args = ', '.join(f'a{j}: {rnd.choice(TYPES)}' for j in range(rnd.randrange(4)))
+        yield i, function.parse(f'{rnd.choice(TYPES)} f{i}({args})')
+
+
+def _type(name):
+    return validate_type(name)[0]
+
+
+def test_queries_match_scans():
+    signatures = dict(_random_signatures(300))
+    signature_index = index.SignatureIndex(signatures.items())
+    for key in range(0, 300, 7):
+        signature_index.remove(key)
+        del signatures[key]
+    assert len(signature_index) == len(signatures)
+
+    def scan(predicate):
+        return {key for key, signature in signatures.items() if predicate(signature)}
+
+    def all_types(signature):
+        return [signature.type] + [arg.type for arg in signature.args]
+
+    for name in TYPES:
+        t = _type(name)
+        assert signature_index.taking(t) == scan(lambda s: t in [arg.type for arg in s.args])
+        assert signature_index.returning(t) == scan(lambda s: s.type is t)
+    for outer in ['int32', 'list', 'BinaryTreeNode', 'TreeNode']:
+        assert signature_index.taking_outer(outer) == scan(lambda s: outer in [arg.type.name for arg in s.args])
+        assert signature_index.returning_outer(outer) == scan(lambda s: s.type.name == outer)
+    for leaf in ['int32', 'char', 'str']:
+        assert signature_index.with_leaf(Type(leaf)) == scan(
+            lambda s: Type(leaf) in [t.leaf_type for t in all_types(s)])
+    for arity in range(4):
+        assert signature_index.with_arity(arity) == scan(lambda s: len(s.args) == arity)
+    assert signature_index.using_custom('LinkedListNode') == scan(
+        lambda s: any('LinkedListNode' in t.custom_type_names for t in all_types(s)))
+    assert signature_index.using_custom() == scan(lambda s: any(t.custom_type_names for t in all_types(s)))
+
+
+def test_add_replaces():
+    signature_index = index.SignatureIndex()
+    signature_index.add('p1', function.parse('int32 f(a: list[int32])'))
+    signature_index.add('p1', function.parse('char f()'))
+    assert signature_index.taking(_type('list[int32]')) == set()
+    assert signature_index.with_arity(0) == {'p1'}
+    assert signature_index['p1'].type is Type('char') and 'p1' in signature_index
+
+
+def test_results_are_copies():
+    signature_index = index.SignatureIndex([('p1', function.parse('int32 f()'))])
+    signature_index.with_arity(0).add('p2')
+    assert signature_index.with_arity(0) == {'p1'}
+    with pytest.raises(KeyError):
+        signature_index.remove('p2')
+
+
+def test_mutated_signature_is_reindexed():
+    signature = function.parse('int32 f(a: list[int32], b: char)')
+    signature_index = index.SignatureIndex([('p1', signature)])
+    signature.args.clear()
+    signature_index.add('p1', signature)
+    assert signature_index.with_arity(0) == {'p1'} and signature_index.with_arity(2) == set()
+    assert signature_index.taking(_type('char')) == set()
+    signature.args.append(function.Argument('a', _type('char')))
+    signature_index.remove('p1')
+    assert 'p1' not in signature_index and signature_index.with_arity(0) == set()
+    assert signature_index.with_leaf(Type('int32')) == set()
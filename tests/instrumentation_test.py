@@ -0,0 +1,58 @@
+import pytest
+
+from problem_function_signature import instrumentation
+from problem_function_signature import signature as function
+
+
+@pytest.fixture
+def records(request):
+    records = []
+    request.addfinalizer(instrumentation.disable)
+    instrumentation.enable(hook=records.append)
+    return records
+
+
+def test_phases_are_timed(records):
+    func = function.parse('list[list[int32]] f(a:int32, b:list[LinkedListNode[char]])')
+    with pytest.raises(function.InvalidNameException):
+        function.parse('int32 f(a:int32, 1b:int32)')
+    stats = instrumentation.disable()
+
+    assert func.to_dict() == function.parse('list[list[int32]] f(a:int32, b:list[LinkedListNode[char]])').to_dict()
+    assert [record.exception is None for record in records] == [True, False]
+    assert records[0].arg_count == 2 and records[0].nesting_depth == 2
+    assert records[0].phase_calls == {'tokenize': 1, 'names': 3, 'types': 3,
+                                      'duplicate_names': 1, 'custom_types': 1, 'type_names': 1}
+    assert records[1].phase_calls['names'] == 3 and records[1].phase_calls['duplicate_names'] == 0
+    assert isinstance(records[1].exception, function.InvalidNameException)
+
+    assert stats.to_dict()['parses'] == 2 and stats.failures == 1
+    assert stats.max_nesting_depth == 2 and stats.max_arg_count == 2
+    assert stats.phase_calls['types'] == 5
+    assert all(seconds >= 0 for seconds in stats.phase_seconds.values())
+
+
+def test_disabled_by_default():
+    assert instrumentation.collector is None
+    assert instrumentation.disable() is None
+
+
+def test_failed_parse_records_depth(records):
+    with pytest.raises(function.InvalidTypeException):
+        function.parse('int32 f(a:list[list[int32]], b:list)')
+    assert records[0].nesting_depth == 2 and records[0].phase_calls['types'] == 3
+
+
+def test_disabled_during_parse(monkeypatch):
+    class Module:
+        """instrumentation as seen by parse while another thread disables it: enabled on the first read only."""
+        PHASES = instrumentation.PHASES
+        ParseRecord = instrumentation.ParseRecord
+        reads = [instrumentation.ParseStats(), None]
+
+        @property
+        def collector(self):
+            return self.reads.pop(0) if self.reads else None
+
+    monkeypatch.setattr(function, 'instrumentation', Module())
+    assert function.parse('int32 f(a:int32)').args[0].name == 'a'
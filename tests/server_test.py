@@ -0,0 +1,91 @@
+import asyncio
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+from problem_function_signature import server
+from problem_function_signature import signature as function
+
+
+@pytest.fixture
+def loop():
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    yield loop
+    loop.close()
+    asyncio.set_event_loop(None)
+
+
+def _exchange(loop, path, requests, workers=0, max_pending=64):
+    """Sends all requests at once over a Unix socket and returns the responses by id."""
+    parse_server = server.ParseServer(workers, max_pending)
+
+    async def client():
+        unix_server = await parse_server.serve_unix(path)
+        reader, writer = await asyncio.open_unix_connection(path)
+        writer.write(b''.join(request + b'\n' for request in requests))
+        writer.write_eof()
+        responses = [json.loads(line) for line in (await reader.read()).splitlines()]
+        writer.close()
+        unix_server.close()
+        await unix_server.wait_closed()
+        return responses
+
+    try:
+        responses = loop.run_until_complete(client())
+    finally:
+        parse_server.close()
+    assert len(responses) == len(requests)
+    return {response['id']: response for response in responses}
+
+
+@pytest.mark.parametrize('workers, max_pending', [(0, 64), (0, 1), (2, 4)])
+def test_batches(loop, tmp_path, workers, max_pending):
+    signatures = ['int32 f(x:int32)', 'int32 f(x)', 'list[char] G(a: LinkedListNode[str])']
+    requests = [json.dumps({'id': i, 'signatures': signatures * i}).encode() for i in range(20)]
+    requests.append(json.dumps({'id': 'lower', 'signatures': signatures[2:], 'allow_uppercase': False}).encode())
+    responses = _exchange(loop, str(tmp_path / 'server.sock'), requests, workers, max_pending)
+
+    expected = [
+        {'result': function.parse(signatures[0]).to_dict()},
+        {'error': {'type': 'ValidationException', 'message': 'Invalid format of function arguments'}},
+        {'result': function.parse(signatures[2], allow_uppercase=True).to_dict()},
+    ]
+    for i in range(20):
+        assert responses[i] == {'id': i, 'results': expected * i}
+    assert responses['lower']['results'] == [
+        {'error': {'type': 'InvalidNameException', 'message': 'Invalid function name: G'}}]
+
+
+def test_stats_and_bad_requests(loop, tmp_path):
+    requests = [b'{"id": 1, "signatures": ["int32 f()", "int32 f()"]}', b'[1]', b'{"id": 2, "signatures": "int32 f()"}',
+                b'{"id": 3, "signatures": [], "allow_uppercase": 1}', b'not json']
+    responses = _exchange(loop, str(tmp_path / 'server.sock'), requests[:1], max_pending=1)
+    assert responses[1]['results'] == [{'result': function.parse('int32 f()').to_dict()}] * 2
+
+    parse_server = server.ParseServer()
+    try:
+        stats = loop.run_until_complete(parse_server._response(b'{"id": 4, "stats": true}'))
+        assert json.loads(stats)['stats']['requests'] == 0
+        for request, request_id in zip(requests[1:], [None, 2, 3, None]):
+            response = json.loads(loop.run_until_complete(parse_server._response(request)))
+            assert response['id'] == request_id and response['error']['type'] == 'RequestError'
+        loop.run_until_complete(parse_server._response(requests[0]))
+        stats = parse_server.stats()
+        assert (stats['requests'], stats['signatures'], stats['invalid']) == (1, 2, 0)
+        assert stats['cache']['hits'] >= 1
+    finally:
+        parse_server.close()
+
+
+def test_stdio():
+    process = subprocess.run(
+        [sys.executable, '-W', 'error::DeprecationWarning', '-m', 'problem_function_signature.cli', '--serve', '-'],
+        input=b'{"id": 1, "signatures": ["int32 f(a:int32)"]}\n{"id": 2, "stats": true}\n',
+        stdout=subprocess.PIPE, cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))), timeout=60)
+    responses = {response['id']: response for response in map(json.loads, process.stdout.splitlines())}
+    assert responses[1]['results'] == [{'result': function.parse('int32 f(a:int32)').to_dict()}]
+    assert 'uptime_seconds' in responses[2]['stats']
@@ -1,3 +1,9 @@
+import json
+import pickle
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
 import pytest
 
 from problem_function_signature import signature as function
@@ -260,3 +266,198 @@ def test_unsupported_types(signature):
 def test_invalid_arguments(signature):
     with pytest.raises(function.ValidationException):
         function.parse(signature)
+
+
+@pytest.mark.parametrize('signature', ['int32 fun(x:int32',
+                                       'int32(x:int32)',
+                                       'int32 (x:int32)',
+                                       'int32 fun\n(x:int32)',
+                                       'a b(' + 'x' * 5000,
+                                       'a b(' + 'x:int32, ' * 5000 + '\n)',
+                                       '(' * 5000 + ' x)',
+                                       ], ids=['unclosed', 'no-space', 'no-return-type', 'newline',
+                                               'long-unclosed', 'long-newline', 'many-parens'])
+def test_malformed_signatures(signature):
+    """Malformed input, including strings that made the former regex backtrack exponentially."""
+    with pytest.raises(function.ValidationException, match='Malformed function signature'):
+        function.parse(signature)
+
+
+@pytest.mark.parametrize('input_func_signature, expected', [
+    ('int32 f (x:int32)', [('f', t.Type('int32')), A('x', t.Type('int32'))]),
+    ('list[int32] int32 f(x:int32)', None),  # The return type is everything before the last space.
+    ('int32 f((x:int32)', None),  # The last '(' opens the arguments.
+])
+def test_signature_split(input_func_signature, expected):
+    if expected is None:
+        with pytest.raises(function.ValidationException):
+            function.parse(input_func_signature)
+    else:
+        func = function.parse(input_func_signature)
+        assert [(func.name, func.type)] + func.args == expected
+
+
+@pytest.mark.parametrize('workers', [0, 2])
+def test_parse_many(workers):
+    signatures = ['int32 f(x:int32)', 'int32 f(x)', 'list[char] g()', 'int32 1f()'] * 5
+    results = list(function.parse_many(iter(signatures), workers=workers, chunk_size=3))
+    assert [signature for signature, _ in results] == signatures
+    for signature, result in results:
+        if isinstance(result, function.ValidationException):
+            with pytest.raises(type(result), match=str(result)):
+                function.parse(signature)
+        else:
+            assert result.to_dict() == function.parse(signature).to_dict()
+
+
+@pytest.mark.parametrize('workers', [0, 2])
+def test_parse_many_rejects_empty_chunks(workers):
+    with pytest.raises(ValueError, match='chunk_size'):
+        function.parse_many(['int32 f()'] * 3, workers=workers, chunk_size=0)
+
+
+@pytest.mark.parametrize('signature, exception, message', [
+    ('int32 f(a:int32, b:int32, b:int32, a:int32)', function.InvalidNameException,
+     '"a" appears more than once among function and argument names'),
+    ('TreeNode[int32] f(a:LinkedListNode[int32], b:LinkedListNode[str], c:TreeNode[str])',
+     function.InvalidTypeException, 'Two declarations of custom type TreeNode'),
+    ('int32 f(list:int32, a:int32, a:int32)', function.InvalidNameException,
+     '"a" appears more than once among function and argument names'),
+    ('int32 f(str:int32, list:LinkedListNode[int32], b:LinkedListNode[str])', function.InvalidTypeException,
+     'Two declarations of custom type LinkedListNode'),
+])
+def test_validation_error_order(signature, exception, message):
+    with pytest.raises(exception) as e:
+        function.parse(signature)
+    assert str(e.value) == message
+
+
+def test_wide_signature():
+    args = ', '.join(f'a{i}:list[LinkedListNode[int32]]' for i in range(5000))
+    assert len(function.parse(f'int32 f({args})').args) == 5000
+    with pytest.raises(function.InvalidNameException, match='"a0" appears more than once'):
+        function.parse(f'int32 f({args}, a0:int32)')
+
+
+def test_compact_signature():
+    func = function.parse('int32 solve(left:int32, right:int32)')
+    other = function.parse('int32  solve(left: int32, right: int32)')
+    assert not hasattr(func, '__dict__')
+    assert func.name is other.name and func.args[1].name is other.args[1].name
+    func.args.append(A('extra', t.Type('char')))  # args stays a regular list.
+    assert len(func.args) == 3
+
+
+@pytest.mark.parametrize('signature', [
+    'int32 fun(   )',
+    'list[int32] fun(z:list[list[char  ]])',
+    'BinaryTreeNode[float] f(x: list[LinkedListNode[bool]], y: TreeNode[str], z: int64)',
+    'list[' * 300 + 'int32' + ']' * 300 + ' f(x: ' + 'list[' * 200 + 'int32' + ']' * 200 + ')',
+])
+def test_to_json(signature):
+    func = function.parse(signature)
+    assert func.to_json() == json.dumps(func.to_dict())
+    assert func.to_json() == json.dumps(func.to_dict())  # Cached fragments.
+
+
+def test_lazy_parse():
+    func = function.parse('list[int32] f(a:int32, b:list[LinkedListNode[char]])', lazy=True)
+    assert func.name == 'f' and func.type == t.Type('list', t.Type('int32'))
+    assert func._pending is not None
+    assert func.args == [A('a', t.Type('int32')), A('b', t.Type('list', t.Type('LinkedListNode', t.Type('char'))))]
+    assert func.to_dict() == function.parse('list[int32] f(a:int32, b:list[LinkedListNode[char]])').to_dict()
+    assert func.validate() is func
+
+
+@pytest.mark.parametrize('signature', ['int32 f(a:int32, a:char)',
+                                       'int32 f(a:LinkedListNode[int32], b:LinkedListNode[char])',
+                                       'int32 f(1a:int32)',
+                                       'int32 f(a:int3)',
+                                       'int32 int64(a:int32)',
+                                       ])
+def test_lazy_parse_defers_argument_errors(signature):
+    func = function.parse(signature, lazy=True)
+    with pytest.raises(function.ValidationException) as eager:
+        function.parse(signature)
+    with pytest.raises(type(eager.value), match=re.escape(str(eager.value))):
+        func.validate()
+    with pytest.raises(type(eager.value)):
+        func.args
+
+
+@pytest.mark.parametrize('signature', ['int3 f(a:int32)', '1 f(a:int32)', 'int32 1f(a:int32)', 'int32 f(a)'])
+def test_lazy_parse_checks_function(signature):
+    with pytest.raises(function.ValidationException):
+        function.parse(signature, lazy=True)
+
+
+def test_allow_uppercase_argument(monkeypatch):
+    monkeypatch.setattr(function, 'ALLOW_UPPERCASE_IN_NAMES', False)
+    assert function.parse('int32 F(x:int32)', allow_uppercase=True).name == 'F'
+    monkeypatch.setattr(function, 'ALLOW_UPPERCASE_IN_NAMES', True)
+    with pytest.raises(function.InvalidNameException):
+        function.parse('int32 f(aB:int32)', allow_uppercase=False)
+
+
+def test_lazy_parse_keeps_allow_uppercase(monkeypatch):
+    monkeypatch.setattr(function, 'ALLOW_UPPERCASE_IN_NAMES', True)
+    func = function.parse('int32 f(aB:int32)', lazy=True, allow_uppercase=False)
+    with pytest.raises(function.InvalidNameException):
+        func.validate()
+
+
+@pytest.mark.parametrize('workers', [0, 2])
+def test_parse_many_allow_uppercase(workers, monkeypatch):
+    monkeypatch.setattr(function, 'ALLOW_UPPERCASE_IN_NAMES', True)
+    results = function.parse_many(['int32 F()'] * 3, workers=workers, chunk_size=1, allow_uppercase=False)
+    assert all(isinstance(result, function.InvalidNameException) for _, result in results)
+
+
+def test_parse_from_threads():
+    signatures = [f'list[{"list[" * i}int32{"]" * i}] f{i}(a{i}:int32, B:LinkedListNode[char], b:{data_type})'
+                  for i in range(200) for data_type in ['char', 'int3', 'LinkedListNode[int32]']]
+
+    def outcome(signature, allow_uppercase):
+        try:
+            return function.parse(signature, allow_uppercase=allow_uppercase).to_json()
+        except function.ValidationException as e:
+            return type(e), str(e)
+
+    expected = {(signature, uppercase): outcome(signature, uppercase)
+                for signature in signatures for uppercase in [False, True]}
+    barrier = threading.Barrier(8)
+
+    def work(seed):
+        barrier.wait()
+        return [((signature, (i + seed) % 2 == 0), outcome(signature, (i + seed) % 2 == 0))
+                for i, signature in enumerate(signatures)]
+
+    with ThreadPoolExecutor(8) as executor:
+        for results in executor.map(work, range(8)):
+            for key, result in results:
+                assert result == expected[key]
+
+
+@pytest.mark.parametrize('lazy', [False, True])
+def test_pickle(lazy):
+    signature = 'list[' * 3000 + 'int32' + ']' * 3000 + ' f(a: LinkedListNode[char], b: LinkedListNode[char], C:int32)'
+    func = function.parse(signature, lazy=lazy, allow_uppercase=True)
+    copy = pickle.loads(pickle.dumps(func))
+    assert type(copy) is type(func) and copy.type is func.type
+    assert copy.args == func.args and copy.args[0].type is func.args[0].type
+    assert copy.to_json() == function.parse(signature, allow_uppercase=True).to_json()
+
+
+def test_pickle_lazy_keeps_pending_error():
+    func = function.parse('int32 f(A:int32, b:int3)', lazy=True, allow_uppercase=False)
+    with pytest.raises(function.InvalidNameException):
+        pickle.loads(pickle.dumps(func)).validate()
+    func = function.parse('int32 f(a:int32)', lazy=True).validate()
+    assert type(pickle.loads(pickle.dumps(func))) is function.Signature
+
+
+def test_compared_by_identity():
+    first = function.parse('int32 f(a: list[int32], b: char)')
+    second = function.parse('int32  f( a:list[int32],b:char )')
+    assert first != second and first.to_dict() == second.to_dict()
+    assert len({first, second}) == 2
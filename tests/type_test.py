@@ -1,3 +1,6 @@
+import copy
+import pickle
+
 import pytest
 
 from problem_function_signature import type as tp
@@ -80,3 +83,121 @@ def test_validate_type():
     assert t[0].name == 'list'
     assert t[0].element_type.primitive
     assert t[0].element_type.name == 'int32'
+
+
+@pytest.mark.parametrize('data_type, expected', [
+    ('list[ list[ char ] ]', tp.Type('list', tp.Type('list', tp.Type('char')))),
+    ('list[int32 ]', tp.Type('list', tp.Type('int32'))),
+    ('list [int32]', None),
+    ('list[int32] ', None),
+    (' int32', None),
+    ('list[]', None),
+    ('list[ ]', None),
+    ('list[int32]]', None),
+    ('list[[int32]]', None),
+    ('int32[int32]', None),
+    ('list[int32\n]', None),
+    ('list[string]', None),
+])
+def test_validate_type_syntax(data_type, expected):
+    result = tp.validate_type(data_type)
+    assert result == ((expected, True) if expected else (None, False))
+
+
+def test_validate_deeply_nested_type():
+    depth = 5000
+    t, valid = tp.validate_type('list[' * depth + 'int32' + ']' * depth)
+    assert valid
+    for _ in range(depth):
+        assert t.name == 'list'
+        t = t.element_type
+    assert t.name == 'int32' and t.primitive
+    assert tp.validate_type('list[' * depth + 'int32' + ']' * (depth - 1)) == (None, False)
+
+
+def test_to_dict_deeply_nested_type():
+    depth = 5000
+    t = tp.validate_type('list[' * depth + 'int32' + ']' * depth)[0]
+    data = t.to_dict()
+    assert tp.Type.from_dict(data) is t
+    for _ in range(depth):
+        data = data['element_type']
+    assert data == {'name': 'int32', 'element_type': None, 'primitive': True, 'custom': False}
+
+
+def test_types_are_interned():
+    t = tp.Type('list', tp.Type('LinkedListNode', tp.Type('int32')))
+    assert t is tp.Type('list', tp.Type('LinkedListNode', tp.Type('int32')))
+    assert t is tp.validate_type('list[ LinkedListNode[int32] ]')[0]
+    assert t is pickle.loads(pickle.dumps(t))
+    assert t is copy.deepcopy(t)
+    assert {t: 1}[tp.validate_type('list[LinkedListNode[int32]]')[0]] == 1
+    assert str(t) == 'list_LinkedListNode_int32'
+
+
+def test_types_are_immutable():
+    t = tp.Type('list', tp.Type('int32'))
+    with pytest.raises(AttributeError):
+        t.name = 'LinkedListNode'
+    assert t.name == 'list'
+    assert not hasattr(t, '__dict__')
+
+
+def test_deeply_nested_type_str():
+    depth = 5000
+    t = tp.validate_type('list[' * depth + 'int32' + ']' * depth)[0]
+    assert str(t) == 'list_' * depth + 'int32'
+    assert hash(t) == hash(('list', t.element_type))
+
+
+def test_contains_list_of_primitive():
+    int32 = tp.Type('int32')
+    assert tp.Type('int32').contains_list_of_primitive() == (False, None)
+    assert tp.Type('list', int32).contains_list_of_primitive() == (True, int32)
+    assert tp.Type('LinkedListNode', int32).contains_list_of_primitive() == (False, int32)
+    assert tp.Type('TreeNode', tp.Type('list', int32)).contains_list_of_primitive() == (True, int32)
+
+
+def test_structural_properties():
+    t = tp.validate_type('list[TreeNode[LinkedListNode[list[char]]]]')[0]
+    assert t.depth == 4 and t.element_type.depth == 3 and t.leaf_type.depth == 0
+    assert t.leaf_type is tp.Type('char')
+    assert t.custom_type_names == {'TreeNode', 'LinkedListNode'}
+    assert tp.Type('list', tp.Type('int32')).custom_type_names == frozenset()
+
+
+def test_registered_types():
+    assert list(tp.primitive_type_names()) == ['int32', 'int64', 'bool', 'char', 'str', 'float']
+    assert list(tp.composite_type_names()) == ['list', 'LinkedListNode', 'BinaryTreeNode', 'TreeNode']
+    assert set(tp.all_type_names()) == set(tp.primitive_type_names()) | set(tp.composite_type_names())
+    assert tp.registry.get('TreeNode') == tp.TypeInfo('TreeNode', composite=True, custom=True)
+    assert tp.registry.get('tree') is None and 'list' in tp.registry
+
+
+def test_register_type(monkeypatch):
+    registry = tp.TypeRegistry()
+    for info in tp.registry:
+        registry.register(*info)
+    registry.register('GraphNode', composite=True, custom=True)
+    registry.register('uint8')
+    version = tp.grammar_version()
+    monkeypatch.setattr(tp, 'registry', registry)
+
+    t = tp.validate_type('list[GraphNode[ uint8 ]]')[0]
+    assert str(t) == 'list_GraphNode_uint8'
+    assert t.element_type.custom and t.custom_type_names == {'GraphNode'}
+    assert tp.validate_type('GraphNode') == (None, False)
+    assert tp.grammar_version() != version
+
+
+@pytest.mark.parametrize('name, composite, custom', [
+    ('int32', False, False),
+    ('Graph Node', True, True),
+    ('list[', True, False),
+    ('', False, False),
+    ('Graph\n', False, False),
+    ('Graph', False, True),
+])
+def test_register_invalid_type(name, composite, custom):
+    with pytest.raises(ValueError):
+        tp.registry.register(name, composite, custom)